@@ -1,3 +1,6 @@
+import json
+from sqlalchemy import String, and_, cast, delete, exists, insert, or_, text, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from sqlalchemy.exc import NoResultFound
@@ -5,8 +8,10 @@ from sqlalchemy.sql import func
 from typing import List, Optional
 from uuid import UUID
 from fastapi import HTTPException
-from .models import (Tender, Bid, BidDecision, BidReview, OrganizationResponsible, TenderHistory, TenderServiceType,
-                     TenderStatus)
+from .models import (Tender, Bid, BidDecision, BidReview, Employee,
+                     OrganizationResponsible, TenderHistory, TenderServiceType,
+                     TenderStatus, BidStatus, BidHistory, OrganizationTenderStats,
+                     OrganizationBidStats)
 from .schemas import TenderCreate, BidCreate, TenderUpdate
 
 
@@ -36,6 +41,8 @@ async def create_tender(db: AsyncSession, tender: TenderCreate) -> Tender:
     """Создает новый тендер."""
     db_tender = Tender(**tender.dict())
     db.add(db_tender)
+    await bump_tender_stats(db, db_tender.organization_id, TenderStatus.Created,
+                            db_tender.service_type, 1)
     await db.commit()
     await db.refresh(db_tender)
     return db_tender
@@ -82,6 +89,9 @@ async def update_tender(db: AsyncSession, tender_id: str, tender_data: TenderUpd
     if not update_data:
         raise HTTPException(status_code=400, detail="Нет данных для обновления")
 
+    # Запоминаем ключ статистики до изменения
+    stats_key = tender_stats_key(existing_tender)
+
     # Обновляем данные тендера
     for key, value in update_data.items():
         if isinstance(value, (TenderServiceType, TenderStatus)):  # Проверяем конкретные перечисления
@@ -91,6 +101,8 @@ async def update_tender(db: AsyncSession, tender_id: str, tender_data: TenderUpd
     # Инкрементируем версию тендера
     existing_tender.version += 1
 
+    await move_tender_stats(db, stats_key, existing_tender)
+
     # Сохраняем изменения в базе данных
     db.add(existing_tender)
     await db.commit()
@@ -115,6 +127,7 @@ async def rollback_tender_version(db: AsyncSession, tender_id: str, version: int
     if tender is None:
         return None
 
+    stats_key = tender_stats_key(tender)
     tender.name = history_entry.name
     tender.description = history_entry.description
     tender.service_type = TenderServiceType(history_entry.service_type)
@@ -123,6 +136,7 @@ async def rollback_tender_version(db: AsyncSession, tender_id: str, version: int
     tender.creator_username = history_entry.creator_username
     tender.version = history_entry.version
 
+    await move_tender_stats(db, stats_key, tender)
     await db.commit()
     return tender
 
@@ -137,14 +151,29 @@ async def create_bid(db: AsyncSession, bid: BidCreate) -> Bid:
     """Создает новое предложение."""
     db_bid = Bid(**bid.dict())
     db.add(db_bid)
+
+    # Учитываем предложение в статистике организации, разместившей тендер
+    tender = await get_tender_by_id(db, bid.tenderId)
+    if tender:
+        await bump_bid_stats(db, tender.organization_id, bid_count=1)
     await db.commit()
     await db.refresh(db_bid)
     return db_bid
 
 
-async def get_bids_by_user(db: AsyncSession, username: str) -> List[Bid]:
-    """Возвращает список предложений, созданных конкретным пользователем."""
-    result = await db.execute(select(Bid).where(Bid.creator_username == username))
+async def get_bids_by_user(db: AsyncSession, username: str, limit: Optional[int] = None,
+                           offset: int = 0) -> List[Bid]:
+    """
+    Возвращает список предложений, созданных конкретным пользователем,
+    с учетом пагинации.
+    """
+    result = await db.execute(
+        select(Bid)
+        .where(Bid.creator_username == username)
+        .order_by(Bid.name)
+        .offset(offset)
+        .limit(limit)
+    )
     return result.scalars().all()
 
 
@@ -195,10 +224,15 @@ async def process_bid_decision(db: AsyncSession, bid_id: UUID, decision: str, us
     responsible_count = responsible_count.scalar()
 
     quorum = min(3, responsible_count)
+    # Статистика учитывает только первое итоговое решение: повторное решение
+    # по уже опубликованному или отклоненному предложению ее не меняет
+    undecided = _enum_value(bid.status) == BidStatus.Created.value
 
     # Если решение отклонить, сразу помечаем предложение как отклоненное
     if decision == "Rejected":
         bid.status = "Canceled"
+        if undecided:
+            await record_bid_decision_stats(db, bid, approved=False)
     else:
         # Проверяем количество согласований
         decisions = await db.execute(select(BidDecision)
@@ -210,6 +244,8 @@ async def process_bid_decision(db: AsyncSession, bid_id: UUID, decision: str, us
         # Если количество решений равно или больше кворума, утверждаем предложение
         if approve_count + 1 >= quorum:  # +1 учитывает текущее решение
             bid.status = "Published"
+            if undecided:
+                await record_bid_decision_stats(db, bid, approved=True)
         else:
             new_decision = BidDecision(bid_id=bid_id, decision=decision, username=username)
             db.add(new_decision)
@@ -252,7 +288,131 @@ async def save_current_version_to_history(db: AsyncSession, tender: Tender):
     )
 
     db.add(history_entry)
-    db.commit()
+
+
+async def apply_tender_rollback(db: AsyncSession, tender: Tender,
+                                history_entry: TenderHistory) -> Tender:
+    """
+    Сохраняет текущую версию тендера в истории, откатывает его к записи истории
+    и инкрементирует версию.
+    """
+    await save_current_version_to_history(db=db, tender=tender)
+
+    stats_key = tender_stats_key(tender)
+    tender.name = history_entry.name
+    tender.description = history_entry.description
+    tender.service_type = history_entry.service_type
+    tender.status = history_entry.status
+    tender.organization_id = history_entry.organization_id
+    tender.creator_username = history_entry.creator_username
+    tender.version += 1  # Инкрементируем версию
+    await move_tender_stats(db, stats_key, tender)
+
+    # Сохраняем изменения в базе данных
+    db.add(tender)
+    await db.commit()
+    await db.refresh(tender)
+    return tender
+
+
+# Статусы предложений, которые отменяются при закрытии тендера
+OUTSTANDING_BID_STATUSES = (BidStatus.Created,)
+
+# Канал уведомлений об изменении предложений и число идентификаторов в одном уведомлении
+# (полезная нагрузка NOTIFY ограничена 8000 байтами)
+BID_EVENTS_CHANNEL = "bid_events"
+BID_EVENTS_BATCH = 150
+
+
+async def publish_bid_events(db: AsyncSession, tender_id, bid_ids: List[UUID],
+                             status: str):
+    """
+    Публикует события изменения предложений через NOTIFY одним запросом.
+    Уведомления доставляются подписчикам только после фиксации транзакции.
+    """
+    payloads = [
+        json.dumps({"tender_id": str(tender_id), "status": status,
+                    "bid_ids": [str(bid_id) for bid_id in batch]})
+        for batch in (bid_ids[i:i + BID_EVENTS_BATCH]
+                      for i in range(0, len(bid_ids), BID_EVENTS_BATCH))
+    ]
+    if payloads:
+        await db.execute(
+            text("SELECT pg_notify(:channel, payload) "
+                 "FROM unnest(CAST(:payloads AS text[])) AS payload"),
+            {"channel": BID_EVENTS_CHANNEL, "payloads": payloads}
+        )
+
+
+async def close_tender_cascade(db: AsyncSession, tender_id: str):
+    """
+    Закрывает тендер и отменяет все его незавершенные предложения в одной транзакции.
+    Предложения обновляются одним UPDATE ... RETURNING, их история сохраняется
+    одним INSERT ... SELECT.
+    Возвращает тендер и идентификаторы отмененных предложений.
+    """
+    # Блокировка тендера не дает создать новые предложения до завершения транзакции
+    result = await db.execute(
+        select(Tender).where(Tender.id == tender_id).with_for_update()
+    )
+    tender = result.scalar_one_or_none()
+    if not tender:
+        return None, []
+
+    if tender.status != TenderStatus.Closed:
+        await save_current_version_to_history(db=db, tender=tender)
+        stats_key = tender_stats_key(tender)
+        tender.status = TenderStatus.Closed
+        tender.version += 1
+        tender.updated_at = func.now()
+        await move_tender_stats(db, stats_key, tender)
+        await db.flush()
+
+    outstanding = and_(Bid.tender_id == tender.id,
+                       Bid.status.in_(OUTSTANDING_BID_STATUSES))
+
+    # Снимок предложений до изменения
+    await db.execute(insert(BidHistory).from_select(
+        ["bid_id", "name", "description", "status", "tender_id", "organization_id",
+         "creator_username", "created_at", "updated_at"],
+        select(Bid.id, Bid.name, Bid.description, cast(Bid.status, String),
+               Bid.tender_id, Bid.organization_id, Bid.creator_username,
+               Bid.created_at, Bid.updated_at)
+        .where(outstanding)
+        .with_for_update()
+    ))
+
+    result = await db.execute(
+        update(Bid)
+        .where(outstanding)
+        .values(status=BidStatus.Canceled, updated_at=func.now())
+        .returning(Bid.id)
+        .execution_options(synchronize_session=False)
+    )
+    bid_ids = result.scalars().all()
+    if bid_ids:
+        await bump_bid_stats(db, tender.organization_id, canceled_count=len(bid_ids))
+
+    await publish_bid_events(db, tender.id, bid_ids, BidStatus.Canceled.value)
+    await db.commit()
+    await db.refresh(tender)
+    return tender, bid_ids
+
+
+async def get_tender_history_versions(db: AsyncSession, tender_id: str,
+                                      versions: List[int]) -> List[TenderHistory]:
+    """
+    Возвращает указанные версии тендера из истории одним запросом
+    по индексу (tender_id, version).
+    """
+    result = await db.execute(
+        select(TenderHistory)
+        .where(
+            TenderHistory.tender_id == tender_id,
+            TenderHistory.version.in_(versions)
+        )
+    )
+    return result.scalars().all()
 
 
 async def get_tender_history_by_version(db: AsyncSession, tender_id: str, version: int):
@@ -264,3 +424,251 @@ async def get_tender_history_by_version(db: AsyncSession, tender_id: str, versio
         )
     )
     return result.scalar_one_or_none()
+
+
+def _enum_value(value):
+    """Возвращает строковое значение перечисления (или саму строку)."""
+    return getattr(value, "value", value)
+
+
+def tender_stats_key(tender: Tender):
+    """Ключ строки статистики, в которую попадает тендер."""
+    return (tender.organization_id, _enum_value(tender.status),
+            _enum_value(tender.service_type))
+
+
+async def upsert_tender_stats(db: AsyncSession, deltas):
+    """
+    Применяет изменения счетчиков тендеров [(ключ, delta), ...] одним запросом.
+    Строки обновляются в порядке сортировки ключей, поэтому параллельные
+    транзакции, переносящие тендеры между одними и теми же строками,
+    не блокируют друг друга по кругу.
+    """
+    rows = sorted(
+        (
+            {"organization_id": organization_id, "status": _enum_value(status),
+             "service_type": _enum_value(service_type), "tender_count": delta}
+            for (organization_id, status, service_type), delta in deltas
+            if organization_id is not None
+        ),
+        key=lambda row: (str(row["organization_id"]), row["status"],
+                         row["service_type"])
+    )
+    if not rows:
+        return
+
+    stmt = pg_insert(OrganizationTenderStats).values(rows)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[
+            OrganizationTenderStats.organization_id,
+            OrganizationTenderStats.status,
+            OrganizationTenderStats.service_type,
+        ],
+        set_={
+            "tender_count": OrganizationTenderStats.tender_count
+            + stmt.excluded.tender_count
+        }
+    )
+    await db.execute(stmt)
+
+
+async def bump_tender_stats(db: AsyncSession, organization_id, status, service_type,
+                            delta: int):
+    """Изменяет счетчик тендеров организации на delta в текущей транзакции."""
+    await upsert_tender_stats(db, [((organization_id, status, service_type), delta)])
+
+
+async def move_tender_stats(db: AsyncSession, old_key, tender: Tender):
+    """
+    Переносит тендер между строками статистики, если изменились
+    организация, статус или тип услуг.
+    """
+    new_key = tender_stats_key(tender)
+    if old_key == new_key:
+        return
+    await upsert_tender_stats(db, [(old_key, -1), (new_key, 1)])
+
+
+async def bump_bid_stats(db: AsyncSession, organization_id, **deltas):
+    """Увеличивает счетчики предложений организации в текущей транзакции."""
+    if organization_id is None:
+        return
+
+    values = {"bid_count": 0, "approved_count": 0, "rejected_count": 0,
+              "canceled_count": 0, "decision_latency_sum": 0}
+    values.update(deltas)
+    stmt = pg_insert(OrganizationBidStats).values(organization_id=organization_id,
+                                                  **values)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[OrganizationBidStats.organization_id],
+        set_={key: getattr(OrganizationBidStats, key) + getattr(stmt.excluded, key)
+              for key in deltas}
+    )
+    await db.execute(stmt)
+
+
+async def record_bid_decision_stats(db: AsyncSession, bid: Bid, approved: bool):
+    """Учитывает итоговое решение по предложению и время, прошедшее с его создания."""
+    organization_id = await db.scalar(
+        select(Tender.organization_id).where(Tender.id == bid.tender_id)
+    )
+    latency = (select(func.extract("epoch", func.now() - Bid.created_at))
+               .where(Bid.id == bid.id)
+               .scalar_subquery())
+    counter = "approved_count" if approved else "rejected_count"
+    await bump_bid_stats(db, organization_id,
+                         **{counter: 1, "decision_latency_sum": latency})
+
+
+async def get_organization_stats(db: AsyncSession, organization_id: UUID):
+    """
+    Возвращает агрегированную статистику организации без сканирования тендеров
+    и предложений.
+    """
+    tender_rows = await db.execute(
+        select(OrganizationTenderStats)
+        .where(OrganizationTenderStats.organization_id == organization_id)
+    )
+    bid_stats = await db.get(OrganizationBidStats, organization_id)
+    return tender_rows.scalars().all(), bid_stats
+
+
+async def refresh_organization_stats(db: AsyncSession):
+    """
+    Полностью пересчитывает агрегаты по базовым таблицам.
+    Выполняется при первом создании таблиц статистики, после массовой загрузки
+    данных в обход ORM и вручную: python -m app.seed refresh-stats.
+    Время принятия решения восстанавливается приближенно по updated_at
+    завершенных предложений. Отмененные предложения с записью в bid_history
+    (ее создает только закрытие тендера) считаются отмененными при закрытии,
+    а не отклоненными.
+    """
+    # Блокировка не дает параллельным транзакциям менять агрегаты во время пересчета:
+    # они дождутся его завершения и применят свои изменения к новым значениям
+    await db.execute(text(
+        "LOCK TABLE organization_tender_stats, organization_bid_stats IN EXCLUSIVE MODE"
+    ))
+    await db.execute(delete(OrganizationTenderStats))
+    await db.execute(delete(OrganizationBidStats))
+
+    await db.execute(pg_insert(OrganizationTenderStats).from_select(
+        ["organization_id", "status", "service_type", "tender_count"],
+        select(Tender.organization_id, Tender.status, Tender.service_type, func.count())
+        .where(Tender.organization_id.is_not(None))
+        .group_by(Tender.organization_id, Tender.status, Tender.service_type)
+    ))
+
+    closed_with_tender = exists().where(BidHistory.bid_id == Bid.id)
+    canceled_on_close = and_(Bid.status == BidStatus.Canceled, closed_with_tender)
+    rejected = and_(Bid.status == BidStatus.Canceled, ~closed_with_tender)
+    decided = or_(Bid.status == BidStatus.Published, rejected)
+    await db.execute(pg_insert(OrganizationBidStats).from_select(
+        ["organization_id", "bid_count", "approved_count", "rejected_count",
+         "canceled_count", "decision_latency_sum"],
+        select(
+            Tender.organization_id,
+            func.count(Bid.id),
+            func.count(Bid.id).filter(Bid.status == BidStatus.Published),
+            func.count(Bid.id).filter(rejected),
+            func.count(Bid.id).filter(canceled_on_close),
+            func.coalesce(
+                func.sum(func.extract("epoch", Bid.updated_at - Bid.created_at))
+                .filter(decided),
+                0
+            )
+        )
+        .join(Tender, Tender.id == Bid.tender_id)
+        .where(Tender.organization_id.is_not(None))
+        .group_by(Tender.organization_id)
+    ))
+    await db.commit()
+
+
+async def get_employee_with_organizations(db: AsyncSession, username: str):
+    """
+    Возвращает сотрудника и идентификаторы организаций, за которые он отвечает,
+    одним запросом.
+    """
+    result = await db.execute(
+        select(Employee, OrganizationResponsible.organization_id)
+        .outerjoin(OrganizationResponsible,
+                   OrganizationResponsible.user_id == Employee.id)
+        .where(Employee.username == username)
+    )
+    rows = result.all()
+    if not rows:
+        return None, []
+    return rows[0][0], [organization_id for _, organization_id in rows
+                        if organization_id is not None]
+
+
+async def fetch_page(db: AsyncSession, query, limit: int, offset: int):
+    """
+    Возвращает строки страницы запроса и общее число строк без учета пагинации.
+    По неполной странице общее число вычисляется без дополнительного запроса,
+    иначе (в том числе при offset за концом результата) выполняется count(*)
+    по тем же условиям.
+    """
+    result = await db.execute(query.offset(offset).limit(limit))
+    rows = result.all()
+    if rows and len(rows) < limit:
+        return rows, offset + len(rows)
+    if not rows and offset == 0:
+        return rows, 0
+    total = await db.scalar(
+        query.with_only_columns(func.count(), maintain_column_froms=True).order_by(None)
+    )
+    return rows, total
+
+
+async def get_user_tenders_with_bid_counts(db: AsyncSession, username: str, limit: int,
+                                           offset: int):
+    """Тендеры пользователя с числом предложений по каждому и общим числом тендеров."""
+    bid_count = (select(func.count(Bid.id))
+                 .where(Bid.tender_id == Tender.id)
+                 .correlate(Tender)
+                 .scalar_subquery())
+    rows, total = await fetch_page(
+        db,
+        select(Tender, bid_count.label("bid_count"))
+        .where(Tender.creator_username == username)
+        .order_by(Tender.name),
+        limit, offset
+    )
+    return [(row.Tender, row.bid_count) for row in rows], total
+
+
+async def get_user_bids_page(db: AsyncSession, username: str, limit: int, offset: int):
+    """Страница предложений пользователя и их общее число."""
+    rows, total = await fetch_page(
+        db,
+        select(Bid).where(Bid.creator_username == username).order_by(Bid.name),
+        limit, offset
+    )
+    return [row.Bid for row in rows], total
+
+
+async def get_pending_decisions(db: AsyncSession, username: str,
+                                organization_ids: List[UUID], limit: int, offset: int):
+    """
+    Предложения на тендеры организаций пользователя, ожидающие решения,
+    по которым пользователь еще не голосовал.
+    """
+    if not organization_ids:
+        return [], 0
+
+    already_decided = exists().where(BidDecision.bid_id == Bid.id,
+                                     BidDecision.username == username)
+    rows, total = await fetch_page(
+        db,
+        select(Bid)
+        .join(Tender, Tender.id == Bid.tender_id)
+        .where(
+            Tender.organization_id.in_(organization_ids),
+            Bid.status == BidStatus.Created,
+            ~already_decided
+        )
+        .order_by(Bid.created_at),
+        limit, offset
+    )
+    return [row.Bid for row in rows], total
@@ -1,47 +1,142 @@
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine
+from sqlalchemy import inspect
 from sqlalchemy.orm import sessionmaker, declarative_base
-from typing import AsyncGenerator
+from typing import AsyncGenerator, List, Optional
+import functools
 import os
 from dotenv import load_dotenv
+from .logging_config import install_sql_logging
 
 # Загрузка переменных окружения из .env файла
+# (настройки остальных модулей тоже читаются из окружения)
 load_dotenv()
 
-# Получение переменных окружения для подключения к базе данных
-POSTGRES_USER = os.getenv("POSTGRES_USERNAME")
-POSTGRES_PASSWORD = os.getenv("POSTGRES_PASSWORD")
-POSTGRES_DB = os.getenv("POSTGRES_DATABASE")
-POSTGRES_HOST = os.getenv("POSTGRES_HOST")
-POSTGRES_PORT = os.getenv("POSTGRES_PORT")
-print(POSTGRES_USER)
+# Создание базового класса для моделей
+Base = declarative_base()
 
-# Проверка на наличие всех необходимых переменных окружения
-if not all([POSTGRES_USER, POSTGRES_PASSWORD, POSTGRES_DB, POSTGRES_HOST, POSTGRES_PORT]):
-    raise ValueError("Не все необходимые переменные окружения заданы для подключения к базе данных.")
+# Движок создается при первом обращении к базе данных, а не при импорте приложения:
+# проверка настроек и загрузка драйвера asyncpg откладываются до первого использования.
+_engine: Optional[AsyncEngine] = None
+_read_engine: Optional[AsyncEngine] = None
 
-# Формирование URL для подключения к базе данных
-DATABASE_URL = f"postgresql+asyncpg://{POSTGRES_USER}:{POSTGRES_PASSWORD}@{POSTGRES_HOST}:{POSTGRES_PORT}/{POSTGRES_DB}"
+# Размер пула соединений и допустимое число соединений сверх него
+POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+POOL_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
 
-# Создание асинхронного движка для подключения к базе данных
-engine = create_async_engine(DATABASE_URL, echo=True)
 
-# Создание базового класса для моделей
-Base = declarative_base()
+def get_database_url() -> str:
+    """Формирует URL для подключения к базе данных из переменных окружения."""
+    user = os.getenv("POSTGRES_USERNAME")
+    password = os.getenv("POSTGRES_PASSWORD")
+    database = os.getenv("POSTGRES_DATABASE")
+    host = os.getenv("POSTGRES_HOST")
+    port = os.getenv("POSTGRES_PORT")
+
+    # Проверка на наличие всех необходимых переменных окружения
+    if not all([user, password, database, host, port]):
+        raise ValueError(
+            "Не все необходимые переменные окружения заданы "
+            "для подключения к базе данных."
+        )
+
+    return f"postgresql+asyncpg://{user}:{password}@{host}:{port}/{database}"
+
+
+def get_engine() -> AsyncEngine:
+    """Возвращает асинхронный движок, создавая его при первом вызове."""
+    global _engine
+    if _engine is None:
+        _engine = create_async_engine(
+            get_database_url(), pool_size=POOL_SIZE, max_overflow=POOL_MAX_OVERFLOW
+        )
+        # Выборочное логирование SQL и логирование медленных запросов
+        install_sql_logging(_engine.sync_engine)
+    return _engine
+
 
-# Создание фабрики сессий для работы с базой данных
-AsyncSessionLocal = sessionmaker(
+def get_read_engine() -> AsyncEngine:
+    """
+    Движок с транзакциями BEGIN READ ONLY.
+    Использует общий пул соединений основного движка.
+    """
+    global _read_engine
+    if _read_engine is None:
+        _read_engine = get_engine().execution_options(postgresql_readonly=True)
+    return _read_engine
+
+
+def pool_headroom() -> int:
+    """Число соединений, которые еще можно получить из пула без ожидания."""
+    checked_out = _engine.sync_engine.pool.checkedout() if _engine is not None else 0
+    return POOL_SIZE + POOL_MAX_OVERFLOW - checked_out
+
+
+# Фабрика сессий без привязки к движку: движок подставляется при создании сессии
+_session_factory = sessionmaker(
     autocommit=False,
     autoflush=False,
-    bind=engine,
     class_=AsyncSession
 )
 
 
+def AsyncSessionLocal() -> AsyncSession:
+    """Создает сессию для работы с базой данных."""
+    return _session_factory(bind=get_engine())
+
+
+def ReadOnlySessionLocal() -> AsyncSession:
+    """Создает сессию только для чтения."""
+    return _session_factory(bind=get_read_engine())
+
+
+async def create_tables() -> List[str]:
+    """
+    Создает недостающие таблицы по метаданным моделей и возвращает имена созданных.
+    """
+    def create(sync_conn):
+        existing = set(inspect(sync_conn).get_table_names())
+        Base.metadata.create_all(sync_conn)
+        return [name for name in Base.metadata.tables if name not in existing]
+
+    async with get_engine().begin() as conn:
+        return await conn.run_sync(create)
+
+
 async def get_db() -> AsyncGenerator[AsyncSession, None]:
     """
     Асинхронная функция для получения сессии базы данных.
     Используется для предоставления сессии в течение времени выполнения запроса.
+    Соединение берется из пула только при первом запросе к базе, а COMMIT
+    выполняется, только если транзакция действительно была начата.
     """
     async with AsyncSessionLocal() as session:
         yield session
-        await session.commit()
+        if session.in_transaction():
+            await session.commit()
+
+
+async def get_read_db() -> AsyncGenerator[AsyncSession, None]:
+    """
+    Сессия для маршрутов, которые только читают данные.
+    Транзакция выполняется в режиме READ ONLY и не завершается COMMIT:
+    при закрытии сессии соединение просто возвращается в пул.
+    """
+    async with ReadOnlySessionLocal() as session:
+        yield session
+
+
+def releases_session(endpoint):
+    """
+    Декоратор обработчика: закрывает сессию db сразу после выполнения обработчика,
+    до сериализации ответа, чтобы соединение не удерживалось на это время.
+    Загруженные атрибуты ORM-объектов после закрытия сессии остаются доступны.
+    """
+    @functools.wraps(endpoint)
+    async def wrapper(*args, **kwargs):
+        try:
+            return await endpoint(*args, **kwargs)
+        finally:
+            db = kwargs.get("db")
+            if db is not None:
+                await db.close()
+    return wrapper
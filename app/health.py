@@ -0,0 +1,114 @@
+"""
+Проверки состояния воркера для балансировщика нагрузки.
+
+Задержка до базы данных и задержка цикла событий измеряются в фоне, поэтому
+проверка готовности не обращается к базе и не занимает соединение из пула.
+"""
+import asyncio
+import os
+import time
+from typing import Optional
+
+from sqlalchemy import text
+
+from .database import get_engine, pool_headroom
+
+
+class HealthMonitor:
+    def __init__(self, probe_interval: float = 2.0, probe_timeout: float = 1.0,
+                 lag_interval: float = 0.5, max_db_latency_ms: float = 500.0,
+                 max_loop_lag_ms: float = 200.0, min_pool_headroom: int = 1):
+        self.probe_interval = probe_interval
+        self.probe_timeout = probe_timeout
+        self.lag_interval = lag_interval
+        self.max_db_latency_ms = max_db_latency_ms
+        self.max_loop_lag_ms = max_loop_lag_ms
+        self.min_pool_headroom = min_pool_headroom
+
+        self.db_latency_ms: Optional[float] = None
+        self.db_error: Optional[str] = None
+        self.db_checked_at: Optional[float] = None
+        self.loop_lag_ms = 0.0
+        self._tasks = []
+
+    @classmethod
+    def from_env(cls) -> "HealthMonitor":
+        return cls(
+            probe_interval=float(os.getenv("HEALTH_PROBE_INTERVAL", "2")),
+            probe_timeout=float(os.getenv("HEALTH_PROBE_TIMEOUT", "1")),
+            max_db_latency_ms=float(os.getenv("READY_MAX_DB_LATENCY_MS", "500")),
+            max_loop_lag_ms=float(os.getenv("READY_MAX_LOOP_LAG_MS", "200")),
+            min_pool_headroom=int(os.getenv("READY_MIN_POOL_HEADROOM", "1"))
+        )
+
+    def start(self):
+        self._tasks = [
+            asyncio.create_task(self._probe_db()),
+            asyncio.create_task(self._measure_loop_lag()),
+        ]
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def probe_db_once(self):
+        """Измеряет время выполнения SELECT 1 через пул соединений."""
+        started = time.perf_counter()
+        try:
+            async with get_engine().connect() as conn:
+                await asyncio.wait_for(conn.execute(text("SELECT 1")),
+                                       timeout=self.probe_timeout)
+        except Exception as e:
+            self.db_latency_ms = None
+            self.db_error = str(e) or type(e).__name__
+        else:
+            self.db_latency_ms = (time.perf_counter() - started) * 1000
+            self.db_error = None
+        self.db_checked_at = time.monotonic()
+
+    async def _probe_db(self):
+        while True:
+            try:
+                await asyncio.wait_for(self.probe_db_once(),
+                                       timeout=self.probe_timeout * 2)
+            except asyncio.TimeoutError:
+                self.db_latency_ms = None
+                self.db_error = "Превышено время ожидания соединения с базой данных"
+                self.db_checked_at = time.monotonic()
+            await asyncio.sleep(self.probe_interval)
+
+    async def _measure_loop_lag(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            started = loop.time()
+            await asyncio.sleep(self.lag_interval)
+            lag = loop.time() - started - self.lag_interval
+            self.loop_lag_ms = max(0.0, lag * 1000)
+
+    def readiness(self) -> dict:
+        """Состояние готовности воркера принимать запросы."""
+        headroom = pool_headroom()
+        stale = (self.db_checked_at is None
+                 or time.monotonic() - self.db_checked_at > self.probe_interval * 3)
+
+        checks = {
+            "database": (self.db_error is None and not stale
+                         and self.db_latency_ms is not None
+                         and self.db_latency_ms <= self.max_db_latency_ms),
+            "pool": headroom >= self.min_pool_headroom,
+            "event_loop": self.loop_lag_ms <= self.max_loop_lag_ms,
+        }
+        return {
+            "ready": all(checks.values()),
+            "checks": checks,
+            "db_latency_ms": (None if self.db_latency_ms is None
+                              else round(self.db_latency_ms, 2)),
+            "db_error": self.db_error,
+            "pool_headroom": headroom,
+            "event_loop_lag_ms": round(self.loop_lag_ms, 2),
+        }
+
+
+monitor = HealthMonitor.from_env()
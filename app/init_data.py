@@ -1,8 +1,32 @@
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from .models import Organization, Employee, OrganizationResponsible, OrganizationType
-from .database import AsyncSessionLocal
+from .database import AsyncSessionLocal, create_tables
+from . import crud
 from uuid import uuid4
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+# Таблицы агрегатов, которые нужно заполнить по существующим данным при их создании
+STATS_TABLES = {"organization_tender_stats", "organization_bid_stats"}
+
+
+async def create_schema():
+    """
+    Создает недостающие таблицы. Если таблицы статистики созданы впервые
+    (например, в существующей базе), заполняет их по уже имеющимся данным.
+    """
+    created = await create_tables()
+    if STATS_TABLES.intersection(created):
+        await refresh_stats()
+
+
+async def refresh_stats():
+    """Пересчитывает агрегаты статистики организаций по базовым таблицам."""
+    async with AsyncSessionLocal() as session:
+        await crud.refresh_organization_stats(session)
 
 
 async def create_base_data():
@@ -46,6 +70,6 @@ async def create_organization_and_user(session: AsyncSession):
         )
         session.add(organization_responsible)
 
-        print("Base data created: Organization 1 and user1.")
+        logger.info("Base data created: Organization 1 and user1.")
     else:
-        print("Base data already exists.")
+        logger.info("Base data already exists.")
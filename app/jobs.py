@@ -0,0 +1,233 @@
+"""
+Фоновые задачи. Задачи хранятся в таблице job и забираются воркерами через
+SELECT ... FOR UPDATE SKIP LOCKED, поэтому несколько воркеров (в том числе в разных
+процессах) не получают одну и ту же задачу. Задача, зависшая в статусе Running
+дольше JOB_STALE_AFTER секунд (например, после падения процесса), выполняется повторно;
+после MAX_ATTEMPTS попыток такая задача переводится в статус Failed. Пока задача
+выполняется, воркер продлевает ее started_at, а итог сохраняет, только если задача
+не была забрана повторно (по номеру попытки).
+"""
+import asyncio
+import logging
+from datetime import timedelta
+from typing import Awaitable, Callable, Dict, Optional
+from uuid import UUID
+
+from sqlalchemy import and_, or_, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+from sqlalchemy.sql import func
+
+from . import crud
+from .database import AsyncSessionLocal
+from .models import Job, JobStatus
+
+logger = logging.getLogger(__name__)
+
+MAX_ATTEMPTS = 3
+
+# Обработчики задач по типу: принимают сессию и payload, возвращают результат (JSON)
+HANDLERS: Dict[str, Callable[[AsyncSession, dict], Awaitable[Optional[dict]]]] = {}
+
+
+def job_handler(kind: str):
+    """Регистрирует обработчик задач указанного типа."""
+    def decorator(func):
+        HANDLERS[kind] = func
+        return func
+    return decorator
+
+
+async def enqueue(db: AsyncSession, kind: str, payload: dict) -> Job:
+    """Ставит задачу в очередь."""
+    job = Job(kind=kind, payload=payload)
+    db.add(job)
+    await db.commit()
+    await db.refresh(job)
+    return job
+
+
+async def get_job(db: AsyncSession, job_id: UUID) -> Optional[Job]:
+    return await db.get(Job, job_id)
+
+
+async def fail_exhausted_jobs(db: AsyncSession, stale_after: float):
+    """Переводит в статус Failed зависшие задачи, у которых не осталось попыток."""
+    exhausted = (
+        select(Job.id)
+        .where(
+            Job.status == JobStatus.Running,
+            Job.started_at < func.now() - timedelta(seconds=stale_after),
+            Job.attempts >= MAX_ATTEMPTS
+        )
+        .with_for_update(skip_locked=True)
+    )
+    await db.execute(
+        update(Job)
+        .where(Job.id.in_(exhausted))
+        .values(
+            status=JobStatus.Failed,
+            error=f"Задача не завершилась за {MAX_ATTEMPTS} попыток",
+            finished_at=func.now()
+        )
+        .execution_options(synchronize_session=False)
+    )
+
+
+async def claim_job(db: AsyncSession, stale_after: float):
+    """
+    Атомарно забирает старейшую доступную задачу и переводит ее в статус Running.
+    Возвращает (id, kind, payload, attempts): номер попытки подтверждает, что задача
+    все еще принадлежит этому воркеру, а не забрана повторно после таймаута.
+    """
+    await fail_exhausted_jobs(db, stale_after)
+    claimable = or_(
+        Job.status == JobStatus.Queued,
+        and_(
+            Job.status == JobStatus.Running,
+            Job.started_at < func.now() - timedelta(seconds=stale_after),
+            Job.attempts < MAX_ATTEMPTS
+        )
+    )
+    candidate = (select(Job.id)
+                 .where(claimable)
+                 .order_by(Job.created_at)
+                 .limit(1)
+                 .with_for_update(skip_locked=True)
+                 .scalar_subquery())
+    result = await db.execute(
+        update(Job)
+        .where(Job.id == candidate)
+        .values(status=JobStatus.Running, started_at=func.now(),
+                attempts=Job.attempts + 1)
+        .returning(Job.id, Job.kind, Job.payload, Job.attempts)
+        .execution_options(synchronize_session=False)
+    )
+    claimed = result.first()
+    await db.commit()
+    return claimed
+
+
+def owned_by(job_id: UUID, attempt: int):
+    """Условие: задача выполняется и не была забрана повторно после этой попытки."""
+    return and_(Job.id == job_id, Job.status == JobStatus.Running,
+                Job.attempts == attempt)
+
+
+async def finish_job(db: AsyncSession, job_id: UUID, attempt: int, status: JobStatus,
+                     result=None, error: Optional[str] = None) -> bool:
+    """
+    Сохраняет итог попытки. Если задача уже забрана другим воркером, ничего
+    не меняет и возвращает False.
+    """
+    updated = await db.execute(
+        update(Job)
+        .where(owned_by(job_id, attempt))
+        .values(status=status, result=result, error=error, finished_at=func.now())
+        .execution_options(synchronize_session=False)
+    )
+    await db.commit()
+    if updated.rowcount == 0:
+        logger.warning("Задача %s (попытка %s) забрана другим воркером, "
+                       "результат не сохранен", job_id, attempt)
+        return False
+    return True
+
+
+async def heartbeat(job_id: UUID, attempt: int, interval: float):
+    """Периодически продлевает started_at, чтобы задачу не забрали повторно."""
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            async with AsyncSessionLocal() as session:
+                await session.execute(
+                    update(Job)
+                    .where(owned_by(job_id, attempt))
+                    .values(started_at=func.now())
+                    .execution_options(synchronize_session=False)
+                )
+                await session.commit()
+        except Exception:
+            logger.exception("Не удалось продлить задачу %s", job_id)
+
+
+async def execute_job(job_id: UUID, kind: str, payload: dict, attempt: int,
+                      heartbeat_interval: float):
+    """Выполняет задачу в отдельной сессии и сохраняет результат или ошибку."""
+    beat = asyncio.create_task(heartbeat(job_id, attempt, heartbeat_interval))
+    async with AsyncSessionLocal() as session:
+        try:
+            handler = HANDLERS.get(kind)
+            if handler is None:
+                raise LookupError(f"Неизвестный тип задачи: {kind}")
+            result = await handler(session, payload)
+        except Exception as e:
+            await session.rollback()
+            status, result, error = JobStatus.Failed, None, str(e)
+        else:
+            status, error = JobStatus.Succeeded, None
+        finally:
+            beat.cancel()
+            await asyncio.gather(beat, return_exceptions=True)
+        await finish_job(session, job_id, attempt, status, result=result, error=error)
+
+
+class JobWorkerPool:
+    """Пул асинхронных воркеров, ограничивающий число одновременно выполняемых задач."""
+
+    def __init__(self, workers: int, poll_interval: float = 1.0,
+                 stale_after: float = 600.0):
+        self.workers = workers
+        self.poll_interval = poll_interval
+        self.stale_after = stale_after
+        self._tasks = []
+
+    def start(self):
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def _worker(self):
+        while True:
+            try:
+                async with AsyncSessionLocal() as session:
+                    claimed = await claim_job(session, self.stale_after)
+                if claimed is None:
+                    await asyncio.sleep(self.poll_interval)
+                    continue
+                await execute_job(*claimed,
+                                  heartbeat_interval=self.stale_after / 3)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Ошибка воркера фоновых задач")
+                await asyncio.sleep(self.poll_interval)
+
+
+@job_handler("tender_rollback")
+async def rollback_tender(db: AsyncSession, payload: dict) -> dict:
+    """Откат тендера к версии из истории."""
+    tender = await crud.get_tender_by_id(db=db, tender_id=payload["tender_id"])
+    history_entry = await crud.get_tender_history_by_version(
+        db=db, tender_id=payload["tender_id"], version=payload["version"]
+    )
+    if not tender or not history_entry:
+        raise LookupError("Тендер или указанная версия тендера не найдены")
+
+    tender = await crud.apply_tender_rollback(db=db, tender=tender,
+                                              history_entry=history_entry)
+    return {"tender_id": str(tender.id), "version": tender.version}
+
+
+@job_handler("tender_close")
+async def close_tender(db: AsyncSession, payload: dict) -> dict:
+    """Закрытие тендера с отменой всех незавершенных предложений."""
+    tender, bid_ids = await crud.close_tender_cascade(db=db,
+                                                      tender_id=payload["tender_id"])
+    if not tender:
+        raise LookupError("Тендер не найден")
+    return {"tender_id": str(tender.id), "canceled_bids": len(bid_ids)}
@@ -0,0 +1,186 @@
+"""
+Структурированное логирование в формате JSON.
+
+Записи попадают в очередь через QueueHandler, а запись в stdout выполняет отдельный
+поток QueueListener, поэтому обработка запросов не блокируется на вводе-выводе.
+Каждая запись содержит идентификатор запроса (X-Request-ID).
+"""
+import json
+import logging
+import os
+import random
+import sys
+import time
+import uuid
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from queue import SimpleQueue
+from typing import Optional
+
+from sqlalchemy import event
+
+request_id_var: ContextVar[Optional[str]] = ContextVar("request_id", default=None)
+
+access_logger = logging.getLogger("app.access")
+sql_logger = logging.getLogger("app.sql")
+
+_listener: Optional[QueueListener] = None
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "request_id": getattr(record, "request_id", None),
+        }
+        entry.update(getattr(record, "fields", {}))
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class RequestIdFilter(logging.Filter):
+    """
+    Добавляет к записи идентификатор текущего запроса.
+    Выполняется в контексте запроса, до передачи записи в очередь.
+    """
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.request_id = request_id_var.get()
+        return True
+
+
+def configure_logging():
+    """
+    Направляет все логи (включая логи uvicorn) через очередь в фоновый поток записи.
+    Access-лог uvicorn отключается: запросы логирует RequestLoggingMiddleware.
+    """
+    global _listener
+    if _listener is not None:
+        return
+
+    stream_handler = logging.StreamHandler(sys.stdout)
+    stream_handler.setFormatter(JsonFormatter())
+
+    queue = SimpleQueue()
+    queue_handler = QueueHandler(queue)
+    queue_handler.addFilter(RequestIdFilter())
+
+    root = logging.getLogger()
+    root.handlers = [queue_handler]
+    root.setLevel(os.getenv("LOG_LEVEL", "INFO").upper())
+
+    for name in ("uvicorn", "uvicorn.error"):
+        logger = logging.getLogger(name)
+        logger.handlers = []
+        logger.propagate = True
+
+    uvicorn_access = logging.getLogger("uvicorn.access")
+    uvicorn_access.handlers = [logging.NullHandler()]
+    uvicorn_access.propagate = False
+
+    _listener = QueueListener(queue, stream_handler, respect_handler_level=True)
+    _listener.start()
+
+
+def shutdown_logging():
+    """Останавливает поток записи, предварительно записав накопленные записи."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+def redact_parameters(parameters):
+    """Скрывает значения параметров запроса, сохраняя их структуру."""
+    if isinstance(parameters, dict):
+        return {key: "?" for key in parameters}
+    if isinstance(parameters, (list, tuple)):
+        if parameters and isinstance(parameters[0], (dict, list, tuple)):
+            return f"<{len(parameters)} наборов параметров>"
+        return ["?"] * len(parameters)
+    return "?"
+
+
+def install_sql_logging(sync_engine, sample_rate: Optional[float] = None,
+                        slow_ms: Optional[float] = None):
+    """
+    Логирует SQL-запросы движка: медленные (не быстрее slow_ms) всегда,
+    с уровнем WARNING, остальные выборочно с вероятностью sample_rate.
+    Значения параметров не логируются.
+    """
+    if sample_rate is None:
+        sample_rate = float(os.getenv("SQL_LOG_SAMPLE_RATE", "0"))
+    slow_ms = float(os.getenv("SLOW_QUERY_MS", "200")) if slow_ms is None else slow_ms
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context,
+                              executemany):
+        conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context,
+                             executemany):
+        duration_ms = (time.perf_counter() - conn.info["query_started"].pop()) * 1000
+        if duration_ms >= slow_ms:
+            level = logging.WARNING
+        elif sample_rate and random.random() < sample_rate:
+            level = logging.INFO
+        else:
+            return
+        message = "slow query" if level == logging.WARNING else "query"
+        sql_logger.log(level, message, extra={"fields": {
+            "statement": statement,
+            "parameters": redact_parameters(parameters),
+            "duration_ms": round(duration_ms, 2),
+        }})
+
+    @event.listens_for(sync_engine, "handle_error")
+    def handle_error(exception_context):
+        # after_cursor_execute не вызывается, если запрос завершился ошибкой
+        connection = exception_context.connection
+        if connection is not None and exception_context.execution_context is not None:
+            started = connection.info.get("query_started")
+            if started:
+                started.pop()
+
+
+class RequestLoggingMiddleware:
+    """ASGI-middleware: назначает запросу идентификатор и пишет access-лог."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        headers = dict(scope.get("headers") or [])
+        request_id = (headers.get(b"x-request-id", b"").decode("latin-1")
+                      or uuid.uuid4().hex)
+        token = request_id_var.set(request_id)
+        started = time.perf_counter()
+        status_code = 500
+
+        async def send_with_request_id(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                message["headers"] = list(message.get("headers", [])) + [
+                    (b"x-request-id", request_id.encode("latin-1"))
+                ]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_request_id)
+        finally:
+            access_logger.info("request", extra={"fields": {
+                "method": scope["method"],
+                "path": scope["path"],
+                "status": status_code,
+                "duration_ms": round((time.perf_counter() - started) * 1000, 2),
+            }})
+            request_id_var.reset(token)
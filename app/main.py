@@ -1,7 +1,14 @@
+import contextvars
+import os
 from fastapi import FastAPI
-from .routers import tenders, bids
-from .database import engine, Base
-from .init_data import create_base_data
+from .routers import tenders, bids, organizations, dashboard, health
+from .routers import jobs as jobs_router
+from .init_data import create_schema
+from .ratelimit import RateLimitMiddleware, load_store
+from .jobs import JobWorkerPool
+from .health import monitor
+from .logging_config import (RequestLoggingMiddleware, configure_logging,
+                             shutdown_logging)
 
 # Экземпляр приложения FastAPI
 app = FastAPI(
@@ -10,22 +17,87 @@ app = FastAPI(
     version="1.0"
 )
 
+# Ограничение частоты запросов по пользователю или организации
+if os.getenv("RATE_LIMIT_ENABLED", "true").lower() == "true":
+    app.add_middleware(
+        RateLimitMiddleware,
+        store=load_store(os.getenv("RATE_LIMIT_BACKEND")),
+        rate=float(os.getenv("RATE_LIMIT_RATE", "20")),  # токенов в секунду
+        capacity=float(os.getenv("RATE_LIMIT_BURST", "40")),
+        # Лимит по адресу клиента, расходуется каждым запросом
+        ip_rate=float(os.getenv("RATE_LIMIT_IP_RATE", "200")),
+        ip_capacity=float(os.getenv("RATE_LIMIT_IP_BURST", "400")),
+        # Число доверенных прокси перед приложением, дописывающих X-Forwarded-For
+        trusted_proxies=int(os.getenv("RATE_LIMIT_TRUSTED_PROXIES", "1")),
+        exempt_paths=("/api/ping", "/api/health/live", "/api/health/ready")
+    )
 
-# Миграции базы данных
-async def create_tables():
-    async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
+# Пул воркеров фоновых задач (JOB_WORKERS=0 отключает выполнение задач в этом процессе)
+job_workers = JobWorkerPool(
+    workers=int(os.getenv("JOB_WORKERS", "2")),
+    poll_interval=float(os.getenv("JOB_POLL_INTERVAL", "1")),
+    stale_after=float(os.getenv("JOB_STALE_AFTER", "600"))
+)
+
+
+def start_background_tasks():
+    job_workers.start()
+    monitor.start()
+
+
+class StartOnFirstRequestMiddleware:
+    """
+    ASGI-middleware: запускает воркеры фоновых задач и мониторинг базы данных
+    при первом HTTP-запросе, поэтому сам запуск процесса к базе данных не обращается.
+    Задачи создаются в пустом контексте, чтобы не унаследовать идентификатор
+    первого запроса в своих логах.
+    """
+
+    def __init__(self, app, on_first_request):
+        self.app = app
+        self.on_first_request = on_first_request
+        self.started = False
 
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http" and not self.started:
+            self.started = True
+            contextvars.Context().run(self.on_first_request)
+        await self.app(scope, receive, send)
 
+
+app.add_middleware(StartOnFirstRequestMiddleware,
+                   on_first_request=start_background_tasks)
+
+# Идентификатор запроса и access-лог
+# (внешний слой, чтобы учитывать и отклоненные запросы)
+app.add_middleware(RequestLoggingMiddleware)
+
+
+# Миграции базы данных (CREATE_TABLES_ON_STARTUP=false отключает их, и тогда движок
+# создается только при первом запросе).
+# Базовые данные создаются отдельно: python -m app.seed base
 @app.on_event("startup")
 async def startup_event():
-    await create_tables()
-    await create_base_data()
+    configure_logging()
+    if os.getenv("CREATE_TABLES_ON_STARTUP", "true").lower() == "true":
+        await create_schema()
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    await monitor.stop()
+    await job_workers.stop()
+    shutdown_logging()
 
 
 # Регистрируем маршруты из тендеров и предложений
 app.include_router(tenders.router, prefix="/api/tenders", tags=["tenders"])
 app.include_router(bids.router, prefix="/api/bids", tags=["bids"])
+app.include_router(organizations.router, prefix="/api/organizations",
+                   tags=["organizations"])
+app.include_router(dashboard.router, prefix="/api/dashboard", tags=["dashboard"])
+app.include_router(jobs_router.router, prefix="/api/jobs", tags=["jobs"])
+app.include_router(health.router, prefix="/api/health", tags=["health"])
 
 
 # Тестовый эндпоинт для проверки доступности приложения
@@ -1,5 +1,5 @@
-from sqlalchemy import Column, String, DateTime, Enum, ForeignKey, Integer
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy import Column, String, DateTime, Enum, Float, ForeignKey, Index, Integer
+from sqlalchemy.dialects.postgresql import JSONB, UUID
 from sqlalchemy.sql import func
 from .database import Base
 import enum
@@ -38,6 +38,9 @@ class TenderServiceType(str, enum.Enum):
 
 class TenderHistory(Base):
     __tablename__ = 'tender_history'
+    __table_args__ = (
+        Index('ix_tender_history_tender_id_version', 'tender_id', 'version'),
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, server_default=func.uuid_generate_v4())
     tender_id = Column(UUID(as_uuid=True), ForeignKey('tender.id', ondelete='CASCADE'))
@@ -115,6 +118,25 @@ class Bid(Base):
     updated_at = Column(DateTime, server_default=func.now())
 
 
+# Модель истории предложений (BidHistory)
+class BidHistory(Base):
+    __tablename__ = 'bid_history'
+
+    id = Column(UUID(as_uuid=True), primary_key=True,
+                server_default=func.uuid_generate_v4())
+    bid_id = Column(UUID(as_uuid=True), ForeignKey('bid.id', ondelete='CASCADE'),
+                    index=True)
+    name = Column(String(100), nullable=False)
+    description = Column(String, nullable=False)
+    status = Column(String(50), nullable=False)
+    tender_id = Column(UUID(as_uuid=True), nullable=True)
+    organization_id = Column(UUID(as_uuid=True), nullable=True)
+    creator_username = Column(String(50), nullable=True)
+    created_at = Column(DateTime, nullable=True)
+    updated_at = Column(DateTime, nullable=True)
+    recorded_at = Column(DateTime, server_default=func.now())
+
+
 # Модель решения по предложению (BidDecision)
 class BidDecision(Base):
     __tablename__ = 'bid_decision'
@@ -135,3 +157,59 @@ class BidReview(Base):
     description = Column(String(1000), nullable=False)
     username = Column(String(50), nullable=False)
     created_at = Column(DateTime, server_default=func.now())
+
+
+# Агрегированная статистика тендеров организации (по статусу и типу услуг)
+class OrganizationTenderStats(Base):
+    __tablename__ = 'organization_tender_stats'
+
+    organization_id = Column(UUID(as_uuid=True),
+                             ForeignKey('organization.id', ondelete='CASCADE'),
+                             primary_key=True)
+    status = Column(String(50), primary_key=True)
+    service_type = Column(String(50), primary_key=True)
+    tender_count = Column(Integer, nullable=False, default=0)
+
+
+# Агрегированная статистика предложений, поданных на тендеры организации
+class OrganizationBidStats(Base):
+    __tablename__ = 'organization_bid_stats'
+
+    organization_id = Column(UUID(as_uuid=True),
+                             ForeignKey('organization.id', ondelete='CASCADE'),
+                             primary_key=True)
+    bid_count = Column(Integer, nullable=False, default=0)
+    approved_count = Column(Integer, nullable=False, default=0)
+    rejected_count = Column(Integer, nullable=False, default=0)
+    # Отменены при закрытии тендера
+    canceled_count = Column(Integer, nullable=False, default=0)
+    # Суммарное время до решения, в секундах
+    decision_latency_sum = Column(Float, nullable=False, default=0)
+
+
+class JobStatus(str, enum.Enum):
+    Queued = "Queued"
+    Running = "Running"
+    Succeeded = "Succeeded"
+    Failed = "Failed"
+
+
+# Модель фоновой задачи (Job)
+class Job(Base):
+    __tablename__ = 'job'
+    __table_args__ = (
+        Index('ix_job_status_created_at', 'status', 'created_at'),
+    )
+
+    id = Column(UUID(as_uuid=True), primary_key=True,
+                server_default=func.uuid_generate_v4())
+    kind = Column(String(50), nullable=False)
+    payload = Column(JSONB, nullable=False, default=dict)
+    status = Column(Enum(JobStatus, name='job_status'), nullable=False,
+                    default=JobStatus.Queued)
+    result = Column(JSONB, nullable=True)
+    error = Column(String, nullable=True)
+    attempts = Column(Integer, nullable=False, default=0)
+    created_at = Column(DateTime, server_default=func.now())
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
@@ -0,0 +1,330 @@
+import abc
+import importlib
+import json
+import math
+import os
+import re
+import time
+from typing import Any, Callable, Dict, Optional, Protocol, Tuple
+from urllib.parse import parse_qs
+
+from starlette.responses import JSONResponse
+
+
+def take_token(tokens: Optional[float], updated: float, now: float, rate: float,
+               capacity: float) -> Tuple[float, float]:
+    """
+    Пополняет корзину за время с updated до now и списывает из нее токен.
+    tokens=None означает новую (полную) корзину. Возвращает новое число токенов
+    и число секунд до появления следующего токена (0, если запрос разрешен).
+    """
+    if tokens is None:
+        tokens = capacity
+    else:
+        tokens = min(capacity, tokens + (now - updated) * rate)
+    if tokens >= 1:
+        return tokens - 1, 0.0
+    return tokens, (1 - tokens) / rate
+
+
+class TokenBucketStore(abc.ABC):
+    """
+    Хранилище корзин токенов. Метод асинхронный, чтобы в качестве хранилища можно было
+    подключить общий для всех воркеров бэкенд (RATE_LIMIT_BACKEND=redis).
+    """
+
+    @abc.abstractmethod
+    async def take(self, key: str, rate: float, capacity: float) -> float:
+        """Списывает токен из корзины key. Возвращает 0, если запрос разрешен,
+        иначе число секунд до появления следующего токена."""
+
+
+class InMemoryTokenBucketStore(TokenBucketStore):
+    """
+    Хранилище корзин в памяти процесса.
+    Полностью восстановившиеся корзины периодически удаляются.
+    """
+
+    def __init__(self, sweep_interval: float = 60.0,
+                 clock: Callable[[], float] = time.monotonic):
+        # key -> (токены, время обновления, время заполнения)
+        self._buckets: Dict[str, Tuple[float, float, float]] = {}
+        self._sweep_interval = sweep_interval
+        self._clock = clock
+        self._next_sweep = clock() + sweep_interval
+
+    def __len__(self):
+        return len(self._buckets)
+
+    async def take(self, key: str, rate: float, capacity: float) -> float:
+        now = self._clock()
+        if now >= self._next_sweep:
+            self.sweep(now)
+
+        bucket = self._buckets.get(key)
+        tokens, retry_after = take_token(
+            None if bucket is None else bucket[0],
+            now if bucket is None else bucket[1],
+            now, rate, capacity,
+        )
+        self._buckets[key] = (tokens, now, now + (capacity - tokens) / rate)
+        return retry_after
+
+    def sweep(self, now: Optional[float] = None):
+        """
+        Удаляет корзины, которые уже заполнились: они не отличаются от отсутствующих.
+        """
+        now = self._clock() if now is None else now
+        self._buckets = {key: bucket for key, bucket in self._buckets.items()
+                         if bucket[2] > now}
+        self._next_sweep = now + self._sweep_interval
+
+
+class ScriptClient(Protocol):
+    """
+    Минимальный клиент, нужный RedisTokenBucketStore
+    (совместим с redis.asyncio.Redis).
+    """
+
+    async def eval(self, script: str, numkeys: int, *keys_and_args: Any) -> Any:
+        ...
+
+
+# Пополнение и списание выполняются атомарно на сервере Redis по его часам,
+# поэтому все воркеры и экземпляры приложения делят одну корзину на ключ.
+# Заполнившаяся корзина удаляется по истечении PEXPIRE, отдельная очистка не нужна.
+TOKEN_BUCKET_SCRIPT = """
+local rate = tonumber(ARGV[1])
+local capacity = tonumber(ARGV[2])
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'updated')
+local tokens = capacity
+if bucket[1] then
+    local elapsed = now - tonumber(bucket[2])
+    tokens = math.min(capacity, tonumber(bucket[1]) + elapsed * rate)
+end
+local retry_after = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+else
+    retry_after = (1 - tokens) / rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'updated', tostring(now))
+redis.call('PEXPIRE', KEYS[1], math.ceil((capacity - tokens) / rate * 1000) + 1000)
+return tostring(retry_after)
+"""
+
+
+class RedisTokenBucketStore(TokenBucketStore):
+    """Общее для всех воркеров хранилище корзин в Redis."""
+
+    def __init__(self, client: ScriptClient, prefix: str = "ratelimit:"):
+        self.client = client
+        self.prefix = prefix
+
+    async def take(self, key: str, rate: float, capacity: float) -> float:
+        result = await self.client.eval(TOKEN_BUCKET_SCRIPT, 1, self.prefix + key,
+                                        rate, capacity)
+        return float(result)
+
+
+class LocalScriptClient:
+    """
+    Локальная замена клиента Redis для TOKEN_BUCKET_SCRIPT: выполняет тот же алгоритм
+    в памяти процесса, включая истечение ключей. Используется в тестах
+    и при разработке без Redis.
+    """
+
+    def __init__(self, clock: Callable[[], float] = time.time):
+        self._clock = clock
+        # key -> (токены, время обновления, время истечения)
+        self._buckets: Dict[str, Tuple[float, float, float]] = {}
+
+    def __len__(self):
+        now = self._clock()
+        return sum(1 for bucket in self._buckets.values() if bucket[2] > now)
+
+    async def eval(self, script: str, numkeys: int, *keys_and_args: Any) -> str:
+        if script != TOKEN_BUCKET_SCRIPT or numkeys != 1:
+            raise ValueError("LocalScriptClient выполняет только TOKEN_BUCKET_SCRIPT")
+        key = keys_and_args[0]
+        rate, capacity = float(keys_and_args[1]), float(keys_and_args[2])
+        now = self._clock()
+        bucket = self._buckets.get(key)
+        if bucket is not None and bucket[2] <= now:
+            bucket = None
+        tokens, retry_after = take_token(
+            None if bucket is None else bucket[0],
+            now if bucket is None else bucket[1],
+            now, rate, capacity,
+        )
+        expires = now + (math.ceil((capacity - tokens) / rate * 1000) + 1000) / 1000
+        self._buckets[key] = (tokens, now, expires)
+        return str(retry_after)
+
+
+def create_redis_store() -> RedisTokenBucketStore:
+    try:
+        from redis.asyncio import Redis
+    except ImportError as exc:
+        raise RuntimeError("Для RATE_LIMIT_BACKEND=redis нужен пакет redis") from exc
+    url = os.getenv("RATE_LIMIT_REDIS_URL", "redis://localhost:6379/0")
+    return RedisTokenBucketStore(Redis.from_url(url))
+
+
+def load_store(path: Optional[str]) -> TokenBucketStore:
+    """
+    Создает хранилище: 'redis' (общее, адрес в RATE_LIMIT_REDIS_URL), путь вида
+    'package.module:factory' или хранилище в памяти по умолчанию.
+    """
+    if not path:
+        sweep_interval = float(os.getenv("RATE_LIMIT_SWEEP_INTERVAL", "60"))
+        return InMemoryTokenBucketStore(sweep_interval=sweep_interval)
+    if path == "redis":
+        return create_redis_store()
+    module_name, _, factory_name = path.partition(":")
+    return getattr(importlib.import_module(module_name), factory_name)()
+
+
+# Маршруты, в которых автор запроса передается только в теле (JSON)
+BODY_KEY_ROUTES = (
+    re.compile(r"^/api/tenders/new$"),
+    re.compile(r"^/api/bids/new$"),
+    re.compile(r"^/api/bids/[^/]+/edit$"),
+)
+# Тело большего размера не разбирается, запрос ограничивается по адресу клиента
+BODY_PEEK_LIMIT = 64 * 1024
+
+
+def key_from_query(query_string: bytes) -> Optional[str]:
+    """Ключ по организации или пользователю из параметров запроса."""
+    params = parse_qs(query_string.decode("latin-1"))
+    for name in ("organizationId", "organization_id"):
+        if params.get(name):
+            return f"org:{params[name][0]}"
+    if params.get("username"):
+        return f"user:{params['username'][0]}"
+    return None
+
+
+def key_from_body(body: bytes) -> Optional[str]:
+    """Ключ по создателю или автору из JSON-тела запроса."""
+    try:
+        data = json.loads(body)
+    except ValueError:
+        return None
+    if not isinstance(data, dict):
+        return None
+    if data.get("creator_username"):
+        return f"user:{data['creator_username']}"
+    if data.get("authorId"):
+        return f"author:{data['authorId']}"
+    if data.get("organization_id"):
+        return f"org:{data['organization_id']}"
+    return None
+
+
+def client_ip(scope, trusted_proxies: int) -> str:
+    """
+    Адрес клиента. За балансировщиком берется из X-Forwarded-For: каждый из
+    trusted_proxies доверенных прокси дописывает адрес в конец заголовка,
+    поэтому более ранние записи, которые мог подставить клиент, не используются.
+    """
+    if trusted_proxies > 0:
+        for name, value in scope.get("headers") or []:
+            if name == b"x-forwarded-for":
+                addresses = [address.strip()
+                             for address in value.decode("latin-1").split(",")
+                             if address.strip()]
+                if addresses:
+                    return addresses[-min(trusted_proxies, len(addresses))]
+    client = scope.get("client")
+    return client[0] if client else "unknown"
+
+
+def needs_body_key(scope) -> bool:
+    return scope.get("method") in ("POST", "PUT", "PATCH") and any(
+        route.match(scope["path"]) for route in BODY_KEY_ROUTES
+    )
+
+
+async def peek_body(receive, limit: int):
+    """
+    Читает тело запроса (не больше limit байт) и возвращает его вместе с функцией
+    receive, которая повторно отдаст прочитанные сообщения приложению.
+    Если тело больше limit, вместо тела возвращается None.
+    """
+    messages = []
+    size = 0
+    complete = False
+    while True:
+        message = await receive()
+        messages.append(message)
+        if message["type"] != "http.request":
+            break
+        size += len(message.get("body", b""))
+        if size > limit:
+            break
+        if not message.get("more_body", False):
+            complete = True
+            break
+
+    async def replay():
+        if messages:
+            return messages.pop(0)
+        return await receive()
+
+    if not complete:
+        return None, replay
+    return b"".join(message.get("body", b"") for message in messages), replay
+
+
+class RateLimitMiddleware:
+    """
+    ASGI-middleware ограничения частоты запросов. Отрабатывает до маршрутизации,
+    поэтому отклоненные запросы не открывают сессию базы данных.
+    Каждый запрос расходует токен корзины адреса клиента с отдельным, более
+    высоким лимитом (за одним адресом может находиться много клиентов), а запрос
+    с пользователем или организацией — еще и токен их корзины. Поэтому перебор
+    имен пользователей с одного адреса не обходит ограничение.
+    """
+
+    def __init__(self, app, store: TokenBucketStore, rate: float, capacity: float,
+                 ip_rate: float, ip_capacity: float, trusted_proxies: int = 1,
+                 exempt_paths=("/api/ping",)):
+        self.app = app
+        self.store = store
+        self.rate = rate
+        self.capacity = capacity
+        self.ip_rate = ip_rate
+        self.ip_capacity = ip_capacity
+        self.trusted_proxies = trusted_proxies
+        self.exempt_paths = set(exempt_paths)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] in self.exempt_paths:
+            await self.app(scope, receive, send)
+            return
+
+        key = key_from_query(scope.get("query_string", b""))
+        if key is None and needs_body_key(scope):
+            body, receive = await peek_body(receive, BODY_PEEK_LIMIT)
+            if body is not None:
+                key = key_from_body(body)
+
+        ip_key = f"ip:{client_ip(scope, self.trusted_proxies)}"
+        retry_after = await self.store.take(ip_key, self.ip_rate, self.ip_capacity)
+        # Корзина пользователя не расходуется на запрос, уже отклоненный по адресу
+        if retry_after == 0 and key is not None:
+            retry_after = await self.store.take(key, self.rate, self.capacity)
+        if retry_after > 0:
+            response = JSONResponse(
+                status_code=429,
+                content={"detail": "Слишком много запросов, повторите позже"},
+                headers={"Retry-After": str(math.ceil(retry_after))}
+            )
+            await response(scope, receive, send)
+            return
+
+        await self.app(scope, receive, send)
@@ -1,9 +1,9 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from .. import crud, schemas, models
-from ..database import get_db
-from typing import List
+from ..database import get_db, get_read_db, releases_session
+from typing import List, Optional
 router = APIRouter()
 
 
@@ -53,9 +53,22 @@ async def create_bid(bid: schemas.BidCreate, db: AsyncSession = Depends(get_db))
 
 
 @router.get("/my", response_model=List[schemas.Bid], summary="Получение предложений пользователя")
-async def get_user_bids(username: str, db: AsyncSession = Depends(get_db)):
-    """Возвращает список предложений текущего пользователя."""
-    bids = await crud.get_bids_by_user(db=db, username=username)
+@releases_session
+async def get_user_bids(
+        username: str,
+        limit: Optional[int] = Query(
+            default=None, ge=1,
+            description="Максимальное число возвращаемых объектов (по умолчанию все)."
+        ),
+        offset: int = Query(
+            default=0, ge=0,
+            description="Количество объектов, которые должны быть пропущены с начала."
+        ),
+        db: AsyncSession = Depends(get_read_db)
+):
+    """Возвращает список предложений текущего пользователя с поддержкой пагинации."""
+    bids = await crud.get_bids_by_user(db=db, username=username, limit=limit,
+                                       offset=offset)
     if bids is None:
         raise HTTPException(status_code=404, detail="Предложения не найдены для данного пользователя")
     return bids
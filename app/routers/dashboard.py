@@ -0,0 +1,72 @@
+import asyncio
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from .. import crud, schemas
+from ..database import ReadOnlySessionLocal, get_read_db, releases_session
+
+router = APIRouter()
+
+
+async def run_in_session(query, **kwargs):
+    """
+    Выполняет запрос в отдельной сессии только для чтения
+    (на отдельном соединении из пула).
+    """
+    async with ReadOnlySessionLocal() as session:
+        return await query(session, **kwargs)
+
+
+@router.get("", response_model=schemas.Dashboard,
+            summary="Сводка тендеров и предложений пользователя")
+@releases_session
+async def get_dashboard(
+        username: str = Query(..., description="Имя пользователя"),
+        limit: int = Query(default=5, ge=1, le=100,
+                           description="Максимальное число объектов в каждом списке."),
+        offset: int = Query(
+            default=0, ge=0,
+            description="Количество объектов, которые должны быть пропущены с начала."
+        ),
+        db: AsyncSession = Depends(get_read_db)
+):
+    """
+    Возвращает тендеры пользователя с числом предложений, его предложения и предложения,
+    ожидающие его решения. Пользователь проверяется один раз, остальные запросы
+    выполняются параллельно на отдельных соединениях.
+    """
+    employee, organization_ids = await crud.get_employee_with_organizations(
+        db=db, username=username
+    )
+    if not employee:
+        raise HTTPException(status_code=401,
+                            detail="Пользователь не существует или некорректен")
+    # Соединение запроса больше не нужно: возвращаем его в пул до параллельных запросов
+    await db.close()
+
+    page = {"limit": limit, "offset": offset}
+    (tenders, tenders_total), (bids, bids_total), (pending, pending_total) = (
+        await asyncio.gather(
+            run_in_session(crud.get_user_tenders_with_bid_counts, username=username,
+                           **page),
+            run_in_session(crud.get_user_bids_page, username=username, **page),
+            run_in_session(crud.get_pending_decisions, username=username,
+                           organization_ids=organization_ids, **page)
+        )
+    )
+
+    return schemas.Dashboard(
+        username=username,
+        organization_ids=organization_ids,
+        limit=limit,
+        offset=offset,
+        tenders=[
+            schemas.DashboardTender.model_validate(tender)
+            .model_copy(update={"bid_count": bid_count})
+            for tender, bid_count in tenders
+        ],
+        tenders_total=tenders_total,
+        bids=[schemas.DashboardBid.model_validate(bid) for bid in bids],
+        bids_total=bids_total,
+        pending_decisions=[schemas.DashboardBid.model_validate(bid) for bid in pending],
+        pending_decisions_total=pending_total
+    )
@@ -0,0 +1,21 @@
+from fastapi import APIRouter
+from fastapi.responses import JSONResponse
+from ..health import monitor
+
+router = APIRouter()
+
+
+@router.get("/live", summary="Проверка работоспособности процесса")
+async def liveness():
+    """Процесс запущен и цикл событий обрабатывает запросы."""
+    return "ok"
+
+
+@router.get("/ready", summary="Проверка готовности принимать запросы")
+async def readiness():
+    """
+    Возвращает 503, если пул соединений исчерпан, база данных недоступна или отвечает
+    слишком медленно, либо цикл событий перегружен.
+    """
+    state = monitor.readiness()
+    return JSONResponse(status_code=200 if state["ready"] else 503, content=state)
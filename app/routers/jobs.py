@@ -0,0 +1,17 @@
+from uuid import UUID
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
+from .. import jobs, schemas
+from ..database import get_read_db, releases_session
+
+router = APIRouter()
+
+
+@router.get("/{job_id}", response_model=schemas.Job, summary="Статус фоновой задачи")
+@releases_session
+async def get_job(job_id: UUID, db: AsyncSession = Depends(get_read_db)):
+    """Возвращает статус и результат фоновой задачи."""
+    job = await jobs.get_job(db=db, job_id=job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Задача не найдена")
+    return job
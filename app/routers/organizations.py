@@ -0,0 +1,70 @@
+from collections import defaultdict
+from uuid import UUID
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+from .. import crud, schemas, models
+from ..database import get_read_db, releases_session
+
+router = APIRouter()
+
+
+@router.get("/{organization_id}/stats", response_model=schemas.OrganizationStats,
+            summary="Статистика тендеров и предложений организации")
+@releases_session
+async def get_organization_stats(
+        organization_id: UUID,
+        username: str = Query(..., description="Имя пользователя"),
+        db: AsyncSession = Depends(get_read_db)
+):
+    """
+    Возвращает статистику организации из предрассчитанных агрегатов.
+    Доступно только ответственным за организацию.
+    """
+    result = await db.execute(
+        select(models.Employee).filter(models.Employee.username == username)
+    )
+    employee = result.scalar_one_or_none()
+    if not employee:
+        raise HTTPException(status_code=401,
+                            detail="Пользователь не существует или некорректен")
+
+    result = await db.execute(select(models.OrganizationResponsible).filter(
+        models.OrganizationResponsible.user_id == employee.id,
+        models.OrganizationResponsible.organization_id == organization_id
+    ))
+    if not result.scalar_one_or_none():
+        raise HTTPException(status_code=403,
+                            detail="Недостаточно прав для выполнения действия")
+
+    tender_rows, bid_stats = await crud.get_organization_stats(
+        db=db, organization_id=organization_id
+    )
+
+    by_status = defaultdict(int)
+    by_service_type = defaultdict(int)
+    for row in tender_rows:
+        by_status[row.status] += row.tender_count
+        by_service_type[row.service_type] += row.tender_count
+    tenders_total = sum(by_status.values())
+
+    bids_total = bid_stats.bid_count if bid_stats else 0
+    approved = bid_stats.approved_count if bid_stats else 0
+    rejected = bid_stats.rejected_count if bid_stats else 0
+    canceled = bid_stats.canceled_count if bid_stats else 0
+    decided = approved + rejected
+
+    return schemas.OrganizationStats(
+        organization_id=organization_id,
+        tenders_total=tenders_total,
+        tenders_by_status=by_status,
+        tenders_by_service_type=by_service_type,
+        bids_total=bids_total,
+        bids_per_tender=bids_total / tenders_total if tenders_total else 0.0,
+        approved_count=approved,
+        rejected_count=rejected,
+        canceled_count=canceled,
+        approval_rate=approved / decided if decided else None,
+        avg_decision_latency_seconds=(bid_stats.decision_latency_sum / decided
+                                      if decided else None)
+    )
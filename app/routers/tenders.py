@@ -2,18 +2,19 @@ from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from typing import List, Optional
-from .. import crud, schemas, models
-from ..database import get_db
+from .. import crud, schemas, models, tender_diff, jobs
+from ..database import get_db, get_read_db, releases_session
 
 router = APIRouter()
 
 
 @router.get("/", response_model=List[schemas.Tender], summary="Получение списка тендеров")
+@releases_session
 async def get_tenders(
         limit: int = Query(10, description="Максимальное число возвращаемых объектов"),
         offset: int = Query(0, description="Количество объектов, которое нужно пропустить с начала"),
         service_type: Optional[List[str]] = Query(None, description="Фильтрация тендеров по типу услуг"),
-        db: AsyncSession = Depends(get_db)
+        db: AsyncSession = Depends(get_read_db)
 ):
     """
     Возвращает список тендеров с возможностью фильтрации по типу услуг.
@@ -55,12 +56,13 @@ async def create_tender(tender: schemas.TenderCreate, db: AsyncSession = Depends
 
 
 @router.get("/my", response_model=List[schemas.Tender], summary="Получить тендеры пользователя")
+@releases_session
 async def get_user_tenders(
         username: str = Query(..., description="Имя пользователя"),
         limit: int = Query(default=5, ge=1, description="Максимальное число возвращаемых объектов."),
         offset: int = Query(default=0, ge=0,
                             description="Количество объектов, которые должны быть пропущены с начала."),
-        db: AsyncSession = Depends(get_db)
+        db: AsyncSession = Depends(get_read_db)
 ):
     """Возвращает список тендеров текущего пользователя с поддержкой пагинации."""
     try:
@@ -155,21 +157,133 @@ async def rollback_tender(tender_id: str, version: int, username: str, db: Async
     if not history_entry:
         raise HTTPException(status_code=404, detail="Указанная версия тендера не найдена")
 
-    # Сохраняем текущую версию тендера в истории
-    await crud.save_current_version_to_history(db=db, tender=tender)
+    # Сохраняем текущую версию в истории и откатываемся к указанной
+    tender = await crud.apply_tender_rollback(db=db, tender=tender,
+                                              history_entry=history_entry)
+
+    return tender
 
-    # Откатываемся к указанной версии
-    tender.name = history_entry.name
-    tender.description = history_entry.description
-    tender.service_type = history_entry.service_type
-    tender.status = history_entry.status
-    tender.organization_id = history_entry.organization_id
-    tender.creator_username = history_entry.creator_username
-    tender.version += 1  # Инкрементируем версию
 
-    # Сохраняем изменения в базе данных
-    db.add(tender)
-    await db.commit()
-    await db.refresh(tender)
+@router.post("/{tender_id}/rollback/{version}/job", response_model=schemas.Job,
+             status_code=202, summary="Фоновый откат версии тендера")
+async def rollback_tender_job(tender_id: str, version: int, username: str,
+                              db: AsyncSession = Depends(get_db)):
+    """Ставит откат тендера к указанной версии в очередь фоновых задач."""
+    result = await db.execute(
+        select(models.Employee).filter(models.Employee.username == username)
+    )
+    if not result.scalar_one_or_none():
+        raise HTTPException(status_code=401,
+                            detail="Пользователь не существует или некорректен")
+
+    tender = await crud.get_tender_by_id(db=db, tender_id=tender_id)
+    if not tender:
+        raise HTTPException(status_code=404, detail="Тендер не найден")
+
+    if not await crud.get_tender_history_by_version(db=db, tender_id=tender_id,
+                                                    version=version):
+        raise HTTPException(status_code=404,
+                            detail="Указанная версия тендера не найдена")
+
+    return await jobs.enqueue(db, "tender_rollback",
+                              {"tender_id": tender_id, "version": version})
 
+
+async def check_tender_responsible(db: AsyncSession, tender_id: str,
+                                   username: str) -> models.Tender:
+    """Проверяет, что пользователь существует и отвечает за организацию тендера."""
+    result = await db.execute(
+        select(models.Employee).filter(models.Employee.username == username)
+    )
+    employee = result.scalar_one_or_none()
+    if not employee:
+        raise HTTPException(status_code=401,
+                            detail="Пользователь не существует или некорректен")
+
+    tender = await crud.get_tender_by_id(db=db, tender_id=tender_id)
+    if not tender:
+        raise HTTPException(status_code=404, detail="Тендер не найден")
+
+    result = await db.execute(select(models.OrganizationResponsible).filter(
+        models.OrganizationResponsible.user_id == employee.id,
+        models.OrganizationResponsible.organization_id == tender.organization_id
+    ))
+    if not result.scalar_one_or_none():
+        raise HTTPException(status_code=403,
+                            detail="Недостаточно прав для выполнения действия")
     return tender
+
+
+@router.put("/{tender_id}/close", response_model=schemas.TenderCloseResult,
+            summary="Закрытие тендера")
+async def close_tender(tender_id: str, username: str,
+                       db: AsyncSession = Depends(get_db)):
+    """
+    Закрывает тендер и отменяет все его незавершенные предложения в одной транзакции.
+    """
+    await check_tender_responsible(db=db, tender_id=tender_id, username=username)
+    # Завершаем транзакцию проверок, чтобы каскад начал новую с блокировкой тендера
+    await db.commit()
+
+    tender, bid_ids = await crud.close_tender_cascade(db=db, tender_id=tender_id)
+    if not tender:
+        raise HTTPException(status_code=404, detail="Тендер не найден")
+    return {"tender": tender, "canceled_bids": len(bid_ids)}
+
+
+@router.post("/{tender_id}/close/job", response_model=schemas.Job, status_code=202,
+             summary="Фоновое закрытие тендера")
+async def close_tender_job(tender_id: str, username: str,
+                           db: AsyncSession = Depends(get_db)):
+    """Ставит закрытие тендера с отменой предложений в очередь фоновых задач."""
+    await check_tender_responsible(db=db, tender_id=tender_id, username=username)
+    return await jobs.enqueue(db, "tender_close", {"tender_id": tender_id})
+
+
+@router.get("/{tender_id}/diff", response_model=schemas.TenderDiff,
+            summary="Сравнение версий тендера")
+@releases_session
+async def get_tender_diff(
+        tender_id: str,
+        from_version: int = Query(..., alias="from", ge=1,
+                                  description="Исходная версия"),
+        to_version: int = Query(..., alias="to", ge=1, description="Конечная версия"),
+        username: str = Query(..., description="Имя пользователя"),
+        db: AsyncSession = Depends(get_read_db)
+):
+    """Возвращает изменения полей тендера между двумя версиями."""
+    result = await db.execute(
+        select(models.Employee).filter(models.Employee.username == username)
+    )
+    if not result.scalar_one_or_none():
+        raise HTTPException(status_code=401,
+                            detail="Пользователь не существует или некорректен")
+
+    cache_key = (tender_id, from_version, to_version)
+    cached = tender_diff.get_cached(cache_key)
+    if cached is not None:
+        return cached
+
+    tender = await crud.get_tender_by_id(db=db, tender_id=tender_id)
+    if not tender:
+        raise HTTPException(status_code=404, detail="Тендер не найден")
+
+    history = await crud.get_tender_history_versions(
+        db=db, tender_id=tender_id, versions=[from_version, to_version]
+    )
+    snapshots = {entry.version: tender_diff.snapshot(entry) for entry in history}
+
+    # Текущая версия тендера хранится в самой таблице тендеров, а не в истории
+    from_history = from_version in snapshots and to_version in snapshots
+    if tender.version not in snapshots:
+        snapshots[tender.version] = tender_diff.snapshot(tender)
+
+    if from_version not in snapshots or to_version not in snapshots:
+        raise HTTPException(status_code=404,
+                            detail="Указанная версия тендера не найдена")
+
+    diff = tender_diff.compute_diff(tender.id, from_version, snapshots[from_version],
+                                    to_version, snapshots[to_version])
+    if from_history:
+        tender_diff.put_cached(cache_key, diff)
+    return diff
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from typing import Optional
+from typing import Any, Dict, List, Optional
 from uuid import UUID
 from datetime import datetime
 from enum import Enum
@@ -117,3 +117,92 @@ class Bid(BaseModel):
 
     class Config:
         orm_mode = True
+
+
+class OrganizationStats(BaseModel):
+    organization_id: UUID
+    tenders_total: int
+    tenders_by_status: Dict[str, int]
+    tenders_by_service_type: Dict[str, int]
+    bids_total: int
+    bids_per_tender: float
+    approved_count: int
+    rejected_count: int
+    canceled_count: int
+    approval_rate: Optional[float] = None
+    avg_decision_latency_seconds: Optional[float] = None
+
+
+class TenderFieldChange(BaseModel):
+    field: str
+    old: Optional[str] = None
+    new: Optional[str] = None
+    text_diff: Optional[List[str]] = None
+
+
+class TenderDiff(BaseModel):
+    tender_id: UUID
+    from_version: int
+    to_version: int
+    changes: List[TenderFieldChange]
+
+
+class Job(BaseModel):
+    id: UUID
+    kind: str
+    status: str
+    payload: Dict[str, Any]
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+    attempts: int
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+    class Config:
+        orm_mode = True
+        use_enum_values = True
+
+
+class TenderCloseResult(BaseModel):
+    tender: Tender
+    canceled_bids: int
+
+
+class DashboardTender(BaseModel):
+    id: UUID
+    name: str
+    status: TenderStatus
+    service_type: TenderServiceType
+    version: int
+    created_at: datetime
+    bid_count: int = 0
+
+    class Config:
+        orm_mode = True
+        use_enum_values = True
+
+
+class DashboardBid(BaseModel):
+    id: UUID
+    name: str
+    status: BidStatus
+    tender_id: UUID
+    created_at: datetime
+
+    class Config:
+        orm_mode = True
+        use_enum_values = True
+
+
+class Dashboard(BaseModel):
+    username: str
+    organization_ids: List[UUID]
+    limit: int
+    offset: int
+    tenders: List[DashboardTender]
+    tenders_total: int
+    bids: List[DashboardBid]
+    bids_total: int
+    pending_decisions: List[DashboardBid]
+    pending_decisions_total: int
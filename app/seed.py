@@ -0,0 +1,328 @@
+"""
+Заполнение базы данных.
+
+    python -m app.seed base
+        Создает базовую организацию и пользователя
+        (ранее выполнялось при старте каждого воркера).
+
+    python -m app.seed refresh-stats
+        Пересчитывает агрегаты статистики организаций по базовым таблицам. При запуске
+        приложения это выполняется автоматически, только если таблицы статистики
+        создаются впервые; после ручных изменений данных запускайте команду явно.
+
+    python -m app.seed bulk --organizations 100 --tenders 1000000 --workers 8
+        Генерирует детерминированные синтетические данные и загружает их через COPY
+        параллельными пачками. На время загрузки вторичные индексы удаляются и затем
+        создаются заново. Для каждой таблицы выводится скорость загрузки (строк/сек).
+"""
+import argparse
+import asyncio
+import hashlib
+import random
+import time
+from datetime import datetime, timedelta
+from uuid import UUID
+
+import asyncpg
+
+from .database import get_database_url
+from .init_data import create_base_data, create_schema, refresh_stats
+from .logging_config import configure_logging, shutdown_logging
+
+# Таблицы в порядке загрузки (с учетом внешних ключей)
+TABLES = [
+    "organization", "employee", "organization_responsible",
+    "tender", "tender_history", "bid", "bid_decision"
+]
+# Таблицы, вторичные индексы которых удаляются на время загрузки
+INDEXED_TABLES = ["tender", "tender_history", "bid", "bid_decision"]
+
+BASE_DATE = datetime(2024, 1, 1)
+YEAR_SECONDS = 365 * 24 * 3600
+ORGANIZATION_TYPES = ["IE", "LLC", "JSC"]
+SERVICE_TYPES = ["Construction", "Delivery", "Manufacture"]
+TENDER_STATUSES = ["Created", "Published", "Closed"]
+BID_STATUSES = ["Created", "Published", "Canceled"]
+
+
+class SeedPlan:
+    """Параметры генерации. Идентификаторы вычисляются по номеру строки, поэтому
+    связи между таблицами не требуют хранения сгенерированных данных в памяти."""
+
+    def __init__(self, args):
+        self.seed = args.seed
+        self.organizations = args.organizations
+        self.users_per_org = args.users_per_org
+        self.tenders = args.tenders
+        self.history_per_tender = args.history_per_tender
+        self.bids_per_tender = args.bids_per_tender
+        self.decisions_per_bid = args.decisions_per_bid
+
+    def uuid(self, kind: str, index: int) -> UUID:
+        return UUID(bytes=hashlib.md5(f"{self.seed}:{kind}:{index}".encode()).digest())
+
+    def rng(self, table: str, batch: int) -> random.Random:
+        return random.Random(f"{self.seed}:{table}:{batch}")
+
+    def user_of(self, organization: int, k: int) -> int:
+        return organization + self.organizations * (k % self.users_per_org)
+
+    def count(self, table: str) -> int:
+        users = self.organizations * self.users_per_org
+        bids = self.tenders * self.bids_per_tender
+        return {
+            "organization": self.organizations,
+            "employee": users,
+            "organization_responsible": users,
+            "tender": self.tenders,
+            "tender_history": self.tenders * self.history_per_tender,
+            "bid": bids,
+            "bid_decision": bids * self.decisions_per_bid,
+        }[table]
+
+
+def _timestamp(rng: random.Random) -> datetime:
+    return BASE_DATE + timedelta(seconds=rng.randrange(YEAR_SECONDS))
+
+
+def generate_rows(plan: SeedPlan, table: str, start: int, stop: int):
+    """
+    Генерирует строки [start, stop) таблицы.
+    Результат зависит только от seed и номера пачки.
+    """
+    rng = plan.rng(table, start)
+    rows = []
+    for i in range(start, stop):
+        if table == "organization":
+            created = _timestamp(rng)
+            rows.append((plan.uuid("organization", i), f"Organization {i}",
+                         f"Seed organization {i}", rng.choice(ORGANIZATION_TYPES),
+                         created, created))
+        elif table == "employee":
+            created = _timestamp(rng)
+            rows.append((plan.uuid("employee", i), f"seed_user_{i}", f"First{i}",
+                         f"Last{i}", created, created))
+        elif table == "organization_responsible":
+            rows.append((plan.uuid("responsible", i),
+                         plan.uuid("organization", i % plan.organizations),
+                         plan.uuid("employee", i)))
+        elif table == "tender":
+            organization = i % plan.organizations
+            creator = plan.user_of(organization, i // plan.organizations)
+            created = _timestamp(rng)
+            rows.append((plan.uuid("tender", i), f"Tender {i}",
+                         f"Seed tender {i} description",
+                         rng.choice(SERVICE_TYPES), rng.choice(TENDER_STATUSES),
+                         plan.uuid("organization", organization),
+                         f"seed_user_{creator}",
+                         plan.history_per_tender + 1, created,
+                         created + timedelta(days=plan.history_per_tender)))
+        elif table == "tender_history":
+            tender, version = divmod(i, plan.history_per_tender)
+            organization = tender % plan.organizations
+            creator = plan.user_of(organization, tender // plan.organizations)
+            created = _timestamp(rng)
+            rows.append((plan.uuid("tender_history", i), plan.uuid("tender", tender),
+                         f"Tender {tender} v{version + 1}",
+                         f"Seed tender {tender} description v{version + 1}",
+                         rng.choice(SERVICE_TYPES), "Created",
+                         plan.uuid("organization", organization),
+                         f"seed_user_{creator}",
+                         version + 1, created, created + timedelta(days=version)))
+        elif table == "bid":
+            tender = i // plan.bids_per_tender
+            organization = rng.randrange(plan.organizations)
+            created = _timestamp(rng)
+            rows.append((plan.uuid("bid", i), f"Bid {i}", f"Seed bid {i} description",
+                         rng.choice(BID_STATUSES), plan.uuid("tender", tender),
+                         plan.uuid("organization", organization),
+                         f"seed_user_{plan.user_of(organization, i)}",
+                         created, created + timedelta(hours=rng.randrange(1, 24 * 14))))
+        elif table == "bid_decision":
+            bid = i // plan.decisions_per_bid
+            organization = (bid // plan.bids_per_tender) % plan.organizations
+            rows.append((plan.uuid("bid_decision", i), plan.uuid("bid", bid),
+                         "Approved", f"seed_user_{plan.user_of(organization, i)}",
+                         _timestamp(rng)))
+    return rows
+
+
+COLUMNS = {
+    "organization": ["id", "name", "description", "type", "created_at", "updated_at"],
+    "employee": ["id", "username", "first_name", "last_name", "created_at",
+                 "updated_at"],
+    "organization_responsible": ["id", "organization_id", "user_id"],
+    "tender": ["id", "name", "description", "service_type", "status", "organization_id",
+               "creator_username", "version", "created_at", "updated_at"],
+    "tender_history": ["id", "tender_id", "name", "description", "service_type",
+                       "status", "organization_id", "creator_username", "version",
+                       "created_at", "updated_at"],
+    "bid": ["id", "name", "description", "status", "tender_id", "organization_id",
+            "creator_username", "created_at", "updated_at"],
+    "bid_decision": ["id", "bid_id", "decision", "username", "created_at"],
+}
+
+
+async def load_table(pool: asyncpg.Pool, plan: SeedPlan, table: str, batch_size: int):
+    """
+    Загружает таблицу через COPY параллельными пачками и выводит скорость загрузки.
+    """
+    total = plan.count(table)
+    if not total:
+        return
+
+    async def load_batch(start: int):
+        # Пачка генерируется только после получения соединения, чтобы в памяти
+        # одновременно находилось не больше пачек, чем соединений в пуле
+        async with pool.acquire() as conn:
+            stop = min(start + batch_size, total)
+            rows = await asyncio.to_thread(generate_rows, plan, table, start, stop)
+            await conn.copy_records_to_table(table, records=rows,
+                                             columns=COLUMNS[table])
+
+    started = time.perf_counter()
+    await asyncio.gather(*(load_batch(start) for start in range(0, total, batch_size)))
+    elapsed = time.perf_counter() - started
+    print(f"{table}: {total} строк за {elapsed:.2f} с "
+          f"({total / elapsed:,.0f} строк/сек)")
+
+
+async def drop_secondary_indexes(conn: asyncpg.Connection):
+    """Удаляет индексы, не обслуживающие ограничения, и возвращает их определения."""
+    rows = await conn.fetch("""
+        SELECT i.indexname, i.indexdef
+        FROM pg_indexes i
+        WHERE i.schemaname = current_schema()
+          AND i.tablename = ANY($1::text[])
+          AND NOT EXISTS (SELECT 1 FROM pg_constraint c WHERE c.conname = i.indexname)
+    """, INDEXED_TABLES)
+    for row in rows:
+        await conn.execute(f'DROP INDEX IF EXISTS "{row["indexname"]}"')
+    return [row["indexdef"] for row in rows]
+
+
+async def non_empty_tables(conn: asyncpg.Connection):
+    """Возвращает таблицы загрузки, в которых уже есть строки."""
+    return [table for table in TABLES
+            if await conn.fetchval(f"SELECT EXISTS (SELECT 1 FROM {table})")]
+
+
+async def recreate_indexes(pool: asyncpg.Pool, index_definitions):
+    """
+    Создает удаленные индексы параллельно.
+    При ошибке выводит определения для ручного восстановления.
+    """
+    async def create_index(definition: str):
+        async with pool.acquire() as conn:
+            await conn.execute(definition)
+
+    started = time.perf_counter()
+    try:
+        await asyncio.gather(*(create_index(definition)
+                               for definition in index_definitions))
+    except Exception:
+        print("Не удалось создать индексы, выполните вручную:", *index_definitions,
+              sep="\n")
+        raise
+    elapsed = time.perf_counter() - started
+    print(f"Индексы ({len(index_definitions)}) созданы за {elapsed:.2f} с")
+
+
+async def bulk(args):
+    plan = SeedPlan(args)
+    await create_schema()
+
+    pool = await asyncpg.create_pool(get_database_url().replace("+asyncpg", ""),
+                                     min_size=args.workers, max_size=args.workers)
+    try:
+        async with pool.acquire() as conn:
+            if args.truncate:
+                await conn.execute(f"TRUNCATE {', '.join(TABLES)} CASCADE")
+            else:
+                # Идентификаторы детерминированы: повторная загрузка в непустые таблицы
+                # завершится конфликтом первичных ключей
+                non_empty = await non_empty_tables(conn)
+                if non_empty:
+                    raise SystemExit(f"Таблицы не пусты ({', '.join(non_empty)}), "
+                                     "используйте --truncate")
+            index_definitions = await drop_secondary_indexes(conn)
+
+        started = time.perf_counter()
+        try:
+            for table in TABLES:
+                await load_table(pool, plan, table, args.batch_size)
+        finally:
+            # Индексы восстанавливаются и при ошибке загрузки
+            await recreate_indexes(pool, index_definitions)
+
+        async with pool.acquire() as conn:
+            await conn.execute(f"ANALYZE {', '.join(TABLES)}")
+    finally:
+        await pool.close()
+
+    # Агрегаты статистики не обновлялись при загрузке через COPY
+    await refresh_stats()
+
+    total = sum(plan.count(table) for table in TABLES)
+    elapsed = time.perf_counter() - started
+    print(f"Итого: {total} строк за {elapsed:.2f} с ({total / elapsed:,.0f} строк/сек)")
+
+
+async def base(args):
+    await create_schema()
+    await create_base_data()
+
+
+async def refresh(args):
+    await create_schema()
+    await refresh_stats()
+    print("Статистика организаций пересчитана")
+
+
+COMMANDS = {"base": base, "refresh-stats": refresh, "bulk": bulk}
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m app.seed",
+                                     description="Заполнение базы данных")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    commands.add_parser("base", help="Создать базовую организацию и пользователя")
+    commands.add_parser("refresh-stats", help="Пересчитать статистику организаций")
+
+    bulk_parser = commands.add_parser("bulk",
+                                      help="Загрузить синтетические данные через COPY")
+    bulk_parser.add_argument("--seed", type=int, default=42, help="Зерно генератора")
+    bulk_parser.add_argument("--organizations", type=int, default=100)
+    bulk_parser.add_argument("--users-per-org", type=int, default=5)
+    bulk_parser.add_argument("--tenders", type=int, default=100_000)
+    bulk_parser.add_argument("--history-per-tender", type=int, default=3)
+    bulk_parser.add_argument("--bids-per-tender", type=int, default=5)
+    bulk_parser.add_argument("--decisions-per-bid", type=int, default=1)
+    bulk_parser.add_argument("--batch-size", type=int, default=20_000,
+                             help="Строк в одной пачке COPY")
+    bulk_parser.add_argument("--workers", type=int, default=8,
+                             help="Число параллельных соединений")
+    bulk_parser.add_argument("--truncate", action="store_true",
+                             help="Очистить таблицы перед загрузкой")
+
+    args = parser.parse_args(argv)
+    if args.command == "bulk" and min(args.organizations, args.users_per_org,
+                                      args.bids_per_tender, args.history_per_tender,
+                                      args.decisions_per_bid) < 1:
+        parser.error("Количества организаций, пользователей, предложений, версий "
+                     "и решений должны быть >= 1")
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    configure_logging()
+    try:
+        asyncio.run(COMMANDS[args.command](args))
+    finally:
+        shutdown_logging()
+
+
+if __name__ == "__main__":
+    main()
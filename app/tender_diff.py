@@ -0,0 +1,61 @@
+import difflib
+import os
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+from . import schemas
+
+# Поля тендера, которые сравниваются между версиями
+DIFF_FIELDS = ("name", "description", "service_type", "status", "organization_id",
+               "creator_username")
+# Поля, для которых дополнительно строится построчный diff
+TEXT_FIELDS = ("name", "description")
+
+CACHE_SIZE = int(os.getenv("TENDER_DIFF_CACHE_SIZE", "1024"))
+
+# Записи истории не меняются, поэтому результат сравнения двух версий из истории
+# можно кэшировать
+_cache: "OrderedDict[Tuple[str, int, int], schemas.TenderDiff]" = OrderedDict()
+
+
+def snapshot(entity) -> Dict[str, Optional[str]]:
+    """Строковое представление сравниваемых полей тендера или записи истории."""
+    values = {}
+    for field in DIFF_FIELDS:
+        value = getattr(entity, field)
+        value = getattr(value, "value", value)  # Enum -> строка
+        values[field] = None if value is None else str(value)
+    return values
+
+
+def compute_diff(tender_id, from_version: int, old: Dict, to_version: int,
+                 new: Dict) -> schemas.TenderDiff:
+    """Вычисляет изменения полей между двумя версиями тендера."""
+    changes = []
+    for field in DIFF_FIELDS:
+        if old[field] == new[field]:
+            continue
+        text_diff = None
+        if field in TEXT_FIELDS:
+            text_diff = list(difflib.unified_diff(
+                (old[field] or "").splitlines(), (new[field] or "").splitlines(),
+                fromfile=f"v{from_version}", tofile=f"v{to_version}", lineterm=""
+            ))
+        changes.append(schemas.TenderFieldChange(field=field, old=old[field],
+                                                 new=new[field], text_diff=text_diff))
+
+    return schemas.TenderDiff(tender_id=tender_id, from_version=from_version,
+                              to_version=to_version, changes=changes)
+
+
+def get_cached(key: Tuple[str, int, int]) -> Optional[schemas.TenderDiff]:
+    diff = _cache.get(key)
+    if diff is not None:
+        _cache.move_to_end(key)
+    return diff
+
+
+def put_cached(key: Tuple[str, int, int], diff: schemas.TenderDiff):
+    _cache[key] = diff
+    _cache.move_to_end(key)
+    while len(_cache) > CACHE_SIZE:
+        _cache.popitem(last=False)
@@ -0,0 +1,111 @@
+"""
+Сравнение времени удержания соединения из пула на один запрос.
+
+    python -m benchmarks.session_hold_time --requests 2000 --concurrency 20
+
+Сценарий "get_db" повторяет прежнее поведение: сессия живет до конца запроса,
+ответ сериализуется при открытой транзакции, в конце выполняется COMMIT.
+Сценарий "get_read_db" соответствует маршрутам чтения: транзакция READ ONLY,
+без COMMIT, соединение возвращается в пул до сериализации ответа.
+Требуется доступная база данных с таблицей tender (см. python -m app.seed bulk).
+"""
+import argparse
+import asyncio
+import statistics
+import time
+from typing import List
+
+from sqlalchemy import event
+from sqlalchemy.future import select
+
+from app import models, schemas
+from app.database import AsyncSessionLocal, ReadOnlySessionLocal, get_engine
+
+
+def track_hold_times(samples: List[float]):
+    """
+    Подписывается на события пула и записывает длительность удержания
+    каждого соединения.
+    """
+    pool = get_engine().sync_engine.pool
+
+    @event.listens_for(pool, "checkout")
+    def on_checkout(dbapi_connection, connection_record, connection_proxy):
+        connection_record.info["checked_out_at"] = time.perf_counter()
+
+    @event.listens_for(pool, "checkin")
+    def on_checkin(dbapi_connection, connection_record):
+        started = connection_record.info.pop("checked_out_at", None)
+        if started is not None:
+            samples.append(time.perf_counter() - started)
+
+
+def serialize(tenders):
+    return [schemas.Tender.model_validate(tender).model_dump_json()
+            for tender in tenders]
+
+
+async def old_request(limit: int):
+    async with AsyncSessionLocal() as session:
+        result = await session.execute(
+            select(models.Tender).order_by(models.Tender.name).limit(limit)
+        )
+        tenders = result.scalars().all()
+        serialize(tenders)
+        await session.commit()
+
+
+async def new_request(limit: int):
+    async with ReadOnlySessionLocal() as session:
+        result = await session.execute(
+            select(models.Tender).order_by(models.Tender.name).limit(limit)
+        )
+        tenders = result.scalars().all()
+        await session.close()
+        serialize(tenders)
+
+
+async def run(scenario, requests: int, concurrency: int, limit: int):
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one():
+        async with semaphore:
+            await scenario(limit)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(requests)))
+    return time.perf_counter() - started
+
+
+def report(name: str, samples: List[float], elapsed: float, requests: int):
+    samples = sorted(samples)
+    p95 = samples[int(len(samples) * 0.95) - 1]
+    mean = statistics.mean(samples)
+    print(f"{name:12} удержание соединения: среднее {mean * 1000:.2f} мс, "
+          f"p95 {p95 * 1000:.2f} мс; "
+          f"пропускная способность {requests / elapsed:.0f} запр/с")
+
+
+async def main(args):
+    samples: List[float] = []
+    track_hold_times(samples)
+
+    # Прогрев пула
+    await run(new_request, args.concurrency, args.concurrency, args.limit)
+
+    for name, scenario in (("get_db", old_request), ("get_read_db", new_request)):
+        samples.clear()
+        elapsed = await run(scenario, args.requests, args.concurrency, args.limit)
+        report(name, list(samples), elapsed, args.requests)
+
+    await get_engine().dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--limit", type=int, default=50, help="Число тендеров в ответе")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,114 @@
+"""
+Время запуска приложения: импорт пакета app и время до первого успешного
+ответа /api/ping.
+
+    python -m benchmarks.startup --runs 5 --import-budget-ms 1250 --ping-budget-ms 1750
+
+Каждое измерение выполняется в новом процессе интерпретатора. По умолчанию сервер
+запускается без создания таблиц (--with-db включает его). Воркеры фоновых задач
+и мониторинг базы данных запускаются первым запросом, поэтому их запуск входит
+в измерение. Если медиана превышает бюджет, скрипт завершается с кодом 1
+и может использоваться как проверка регрессии. Бюджеты по умолчанию — измеренные
+медианы (импорт ~1.0–1.15 с, первый /api/ping ~1.3–1.5 с) с небольшим запасом.
+"""
+import argparse
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+
+IMPORT_SNIPPET = ("import time; t = time.perf_counter(); import app.main; "
+                  "print(time.perf_counter() - t)")
+
+
+def measure_import(env) -> float:
+    output = subprocess.run([sys.executable, "-c", IMPORT_SNIPPET], env=env, check=True,
+                            capture_output=True, text=True).stdout
+    return float(output.strip().splitlines()[-1]) * 1000
+
+
+def top_imports(env, count: int):
+    """Самые тяжелые модули по данным python -X importtime (накопленное время, мс)."""
+    command = [sys.executable, "-X", "importtime", "-c", "import app.main"]
+    stderr = subprocess.run(command, env=env, check=True, capture_output=True,
+                            text=True).stderr
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        rows.append((int(cumulative) / 1000, name.rstrip()))
+    return sorted(rows, reverse=True)[:count]
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def measure_first_ping(env, timeout: float) -> float:
+    port = free_port()
+    url = f"http://127.0.0.1:{port}/api/ping"
+    started = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port)],
+        env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        while time.perf_counter() - started < timeout:
+            try:
+                with urllib.request.urlopen(url, timeout=1) as response:
+                    if response.status == 200:
+                        return (time.perf_counter() - started) * 1000
+            except (urllib.error.URLError, ConnectionError):
+                time.sleep(0.01)
+        raise TimeoutError(f"/api/ping не ответил за {timeout} с")
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--import-budget-ms", type=float, default=1250)
+    parser.add_argument("--ping-budget-ms", type=float, default=1750)
+    parser.add_argument("--top", type=int, default=10,
+                        help="Показать N самых тяжелых импортов")
+    parser.add_argument("--with-db", action="store_true",
+                        help="Создавать таблицы при запуске")
+    args = parser.parse_args()
+
+    env = dict(os.environ)
+    if not args.with_db:
+        env.update(CREATE_TABLES_ON_STARTUP="false")
+
+    import_times = [measure_import(env) for _ in range(args.runs)]
+    ping_times = [measure_first_ping(env, timeout=30) for _ in range(args.runs)]
+
+    import_ms = statistics.median(import_times)
+    ping_ms = statistics.median(ping_times)
+    print(f"Импорт app.main: медиана {import_ms:.0f} мс "
+          f"(бюджет {args.import_budget_ms:.0f} мс)")
+    print(f"До первого /api/ping: медиана {ping_ms:.0f} мс "
+          f"(бюджет {args.ping_budget_ms:.0f} мс)")
+
+    if args.top:
+        print("Самые тяжелые импорты (накопленное время):")
+        for cumulative_ms, name in top_imports(env, args.top):
+            print(f"  {cumulative_ms:8.1f} мс  {name.strip()}")
+
+    if import_ms > args.import_budget_ms or ping_ms > args.ping_budget_ms:
+        print("Бюджет времени запуска превышен")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+import asyncio
+import uuid
+
+import pytest
+
+from app import crud
+from app.models import Bid, BidStatus
+
+
+class FakeResult:
+    def __init__(self, value):
+        self.value = value
+
+    def scalar(self):
+        return self.value
+
+    def scalars(self):
+        return self
+
+    def all(self):
+        return self.value
+
+
+class FakeSession:
+    def __init__(self, bid, responsible_count, decisions=()):
+        self.bid = bid
+        self.results = [FakeResult(responsible_count), FakeResult(list(decisions))]
+
+    async def get(self, model, key):
+        return self.bid
+
+    async def execute(self, statement):
+        return self.results.pop(0)
+
+    def add(self, instance):
+        pass
+
+    async def commit(self):
+        pass
+
+    async def refresh(self, instance):
+        pass
+
+
+@pytest.mark.parametrize("status, decision, expected", [
+    (BidStatus.Created, "Approved", [True]),
+    (BidStatus.Created, "Rejected", [False]),
+    # Повторное решение по уже решенному предложению в статистику не попадает
+    (BidStatus.Published, "Approved", []),
+    (BidStatus.Canceled, "Rejected", []),
+    ("Published", "Rejected", []),
+])
+def test_bid_decision_stats_counted_once(monkeypatch, status, decision, expected):
+    recorded = []
+
+    async def fake_record(db, bid, approved):
+        recorded.append(approved)
+
+    monkeypatch.setattr(crud, "record_bid_decision_stats", fake_record)
+    bid = Bid(id=uuid.uuid4(), status=status, organization_id=uuid.uuid4())
+    db = FakeSession(bid, responsible_count=1)
+
+    asyncio.run(crud.process_bid_decision(db, bid.id, decision, "alice"))
+    assert recorded == expected
@@ -0,0 +1,57 @@
+import time
+
+import pytest
+
+from app import health
+from app.health import HealthMonitor
+
+
+@pytest.fixture
+def headroom(monkeypatch):
+    value = {"headroom": 5}
+    monkeypatch.setattr(health, "pool_headroom", lambda: value["headroom"])
+    return value
+
+
+def healthy_monitor():
+    monitor = HealthMonitor(probe_interval=2.0, max_db_latency_ms=500.0,
+                            max_loop_lag_ms=200.0, min_pool_headroom=1)
+    monitor.db_latency_ms = 10.0
+    monitor.db_checked_at = time.monotonic()
+    monitor.loop_lag_ms = 5.0
+    return monitor
+
+
+def test_readiness_all_checks_pass(headroom):
+    status = healthy_monitor().readiness()
+    assert status["ready"] is True
+    assert status["checks"] == {"database": True, "pool": True, "event_loop": True}
+    assert status["pool_headroom"] == 5
+
+
+@pytest.mark.parametrize("breaks, failed_check", [
+    # Проба не выполнялась дольше трех интервалов
+    (lambda monitor: setattr(monitor, "db_checked_at", time.monotonic() - 7.0),
+     "database"),
+    (lambda monitor: setattr(monitor, "db_checked_at", None), "database"),
+    (lambda monitor: setattr(monitor, "db_error", "connection refused"), "database"),
+    (lambda monitor: setattr(monitor, "db_latency_ms", 501.0), "database"),
+    (lambda monitor: setattr(monitor, "db_latency_ms", None), "database"),
+    (lambda monitor: setattr(monitor, "loop_lag_ms", 250.0), "event_loop"),
+], ids=["stale", "never-probed", "db-error", "slow-db", "no-latency", "loop-lag"])
+def test_readiness_failing_checks(headroom, breaks, failed_check):
+    monitor = healthy_monitor()
+    breaks(monitor)
+    status = monitor.readiness()
+
+    assert status["ready"] is False
+    assert [name for name, ok in status["checks"].items() if not ok] == [failed_check]
+
+
+def test_readiness_pool_headroom_below_minimum(headroom):
+    headroom["headroom"] = 0
+    status = healthy_monitor().readiness()
+
+    assert status["ready"] is False
+    assert status["checks"]["pool"] is False
+    assert status["pool_headroom"] == 0
@@ -0,0 +1,77 @@
+import asyncio
+import uuid
+
+from app import jobs
+from app.models import JobStatus
+
+
+class FakeResult:
+    def __init__(self, rowcount):
+        self.rowcount = rowcount
+
+
+class FakeSession:
+    def __init__(self, log, rowcount=1):
+        self.log = log
+        self.rowcount = rowcount
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        return False
+
+    async def execute(self, statement):
+        self.log.append(statement)
+        return FakeResult(self.rowcount)
+
+    async def commit(self):
+        pass
+
+    async def rollback(self):
+        pass
+
+
+def compiled(statement):
+    return str(statement.compile(compile_kwargs={"literal_binds": True}))
+
+
+def test_finish_job_requires_ownership():
+    log = []
+    job_id = uuid.uuid4()
+    stale = FakeSession(log, rowcount=0)
+
+    saved = asyncio.run(jobs.finish_job(stale, job_id, 2, JobStatus.Succeeded))
+    assert saved is False
+    where = compiled(log[0]).split("WHERE", 1)[1]
+    assert "job.status = 'Running'" in where
+    assert "job.attempts = 2" in where
+
+
+def test_execute_job_heartbeats_while_running(monkeypatch):
+    log = []
+    finished = []
+
+    async def slow_handler(db, payload):
+        await asyncio.sleep(0.05)
+        return {"ok": True}
+
+    async def fake_finish(db, job_id, attempt, status, result=None, error=None):
+        finished.append((attempt, status, result, error))
+
+    monkeypatch.setitem(jobs.HANDLERS, "slow", slow_handler)
+    monkeypatch.setattr(jobs, "AsyncSessionLocal", lambda: FakeSession(log))
+    monkeypatch.setattr(jobs, "finish_job", fake_finish)
+
+    async def run():
+        await jobs.execute_job(uuid.uuid4(), "slow", {}, 1, heartbeat_interval=0.01)
+        beats = len(log)
+        await asyncio.sleep(0.03)
+        return beats
+
+    beats = asyncio.run(run())
+    assert beats >= 2
+    # После завершения задачи продление остановлено
+    assert len(log) == beats
+    assert all("started_at" in compiled(statement) for statement in log)
+    assert finished == [(1, JobStatus.Succeeded, {"ok": True}, None)]
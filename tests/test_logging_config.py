@@ -0,0 +1,41 @@
+import logging
+
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import OperationalError
+
+from app.logging_config import configure_logging, install_sql_logging, shutdown_logging
+
+
+def test_sql_logging_start_times_do_not_leak_on_errors():
+    engine = create_engine("sqlite://")
+    install_sql_logging(engine, sample_rate=0, slow_ms=10_000)
+
+    with engine.connect() as connection:
+        connection.execute(text("SELECT 1"))
+        for _ in range(3):
+            with pytest.raises(OperationalError):
+                connection.execute(text("SELECT * FROM missing_table"))
+        connection.execute(text("SELECT 1"))
+        assert connection.info["query_started"] == []
+
+
+@pytest.fixture
+def restore_logging():
+    # configure_logging меняет корневой логгер и логгеры uvicorn
+    loggers = [logging.getLogger(name)
+               for name in ("", "uvicorn", "uvicorn.error", "uvicorn.access")]
+    saved = [(logger.handlers, logger.level, logger.propagate) for logger in loggers]
+    yield
+    shutdown_logging()
+    for logger, (handlers, level, propagate) in zip(loggers, saved):
+        logger.handlers, logger.propagate = handlers, propagate
+        logger.setLevel(level)
+
+
+def test_uvicorn_access_log_is_not_duplicated(restore_logging):
+    configure_logging()
+    access = logging.getLogger("uvicorn.access")
+    assert access.propagate is False
+    assert all(isinstance(handler, logging.NullHandler) for handler in access.handlers)
+    assert logging.getLogger("uvicorn.error").propagate is True
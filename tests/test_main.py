@@ -0,0 +1,32 @@
+import asyncio
+
+from starlette.applications import Starlette
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+from starlette.testclient import TestClient
+
+from app.logging_config import RequestLoggingMiddleware, request_id_var
+from app.main import StartOnFirstRequestMiddleware
+
+
+def test_background_tasks_do_not_inherit_request_id():
+    seen = []
+    tasks = []
+
+    async def background():
+        seen.append(request_id_var.get())
+
+    def start():
+        tasks.append(asyncio.create_task(background()))
+
+    async def ping(request):
+        await asyncio.gather(*tasks)
+        return JSONResponse({"request_id": request_id_var.get()})
+
+    app = Starlette(routes=[Route("/api/ping", ping)])
+    app.add_middleware(StartOnFirstRequestMiddleware, on_first_request=start)
+    app.add_middleware(RequestLoggingMiddleware)
+
+    response = TestClient(app).get("/api/ping", headers={"X-Request-ID": "req-1"})
+    assert response.json() == {"request_id": "req-1"}
+    assert seen == [None]
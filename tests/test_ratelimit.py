@@ -0,0 +1,256 @@
+import asyncio
+import json
+
+import pytest
+from starlette.applications import Starlette
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+from starlette.testclient import TestClient
+
+from app.ratelimit import (
+    InMemoryTokenBucketStore,
+    LocalScriptClient,
+    RateLimitMiddleware,
+    RedisTokenBucketStore,
+    TokenBucketStore,
+    client_ip,
+    key_from_body,
+    key_from_query,
+    peek_body,
+    take_token,
+)
+
+
+class FakeClock:
+    def __init__(self, now: float = 1000.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def take_many(store, key, count, rate=1.0, capacity=3.0):
+    return [asyncio.run(store.take(key, rate, capacity)) for _ in range(count)]
+
+
+# Математика корзины
+
+def test_take_token_new_bucket_is_full():
+    assert take_token(None, 0.0, 0.0, rate=2.0, capacity=5.0) == (4.0, 0.0)
+
+
+def test_take_token_refills_up_to_capacity():
+    tokens, retry_after = take_token(0.0, 0.0, 100.0, rate=2.0, capacity=5.0)
+    assert (tokens, retry_after) == (4.0, 0.0)
+
+
+def test_take_token_empty_bucket_reports_retry_after():
+    tokens, retry_after = take_token(0.5, 10.0, 10.0, rate=2.0, capacity=5.0)
+    assert tokens == 0.5
+    assert retry_after == pytest.approx(0.25)
+
+
+@pytest.mark.parametrize("make_store", [
+    lambda clock: InMemoryTokenBucketStore(clock=clock),
+    lambda clock: RedisTokenBucketStore(LocalScriptClient(clock=clock)),
+], ids=["memory", "redis"])
+def test_store_burst_then_refill(make_store):
+    clock = FakeClock()
+    store = make_store(clock)
+
+    assert take_many(store, "user:a", 3) == [0.0, 0.0, 0.0]
+    assert take_many(store, "user:a", 1)[0] == pytest.approx(1.0)
+    # Корзины разных ключей независимы
+    assert take_many(store, "user:b", 1) == [0.0]
+
+    clock.now += 1.0
+    assert take_many(store, "user:a", 1) == [0.0]
+    assert take_many(store, "user:a", 1)[0] == pytest.approx(1.0)
+
+
+def test_token_bucket_store_is_abstract():
+    with pytest.raises(TypeError):
+        TokenBucketStore()
+
+
+# Очистка заполнившихся корзин
+
+def test_in_memory_sweep_removes_only_full_buckets():
+    clock = FakeClock()
+    store = InMemoryTokenBucketStore(sweep_interval=10.0, clock=clock)
+    take_many(store, "user:a", 1)  # заполнится через 1 с
+    take_many(store, "user:b", 3)  # заполнится через 3 с
+    assert len(store) == 2
+
+    clock.now += 2.0
+    store.sweep()
+    assert len(store) == 1
+
+    clock.now += 2.0
+    store.sweep()
+    assert len(store) == 0
+
+
+def test_in_memory_sweep_runs_lazily_on_take():
+    clock = FakeClock()
+    store = InMemoryTokenBucketStore(sweep_interval=10.0, clock=clock)
+    for index in range(100):
+        take_many(store, f"ip:{index}", 1)
+    assert len(store) == 100
+
+    clock.now += 11.0
+    take_many(store, "ip:new", 1)
+    assert len(store) == 1
+
+
+def test_local_script_client_expires_full_buckets():
+    clock = FakeClock()
+    client = LocalScriptClient(clock=clock)
+    store = RedisTokenBucketStore(client)
+    take_many(store, "user:a", 3)
+    assert len(client) == 1
+
+    clock.now += 5.0
+    assert len(client) == 0
+
+
+def test_local_script_client_rejects_other_scripts():
+    with pytest.raises(ValueError):
+        asyncio.run(LocalScriptClient().eval("return 1", 0))
+
+
+# Выбор ключа
+
+@pytest.mark.parametrize("query_string, expected", [
+    (b"organizationId=org-1&username=alice", "org:org-1"),
+    (b"organization_id=org-2", "org:org-2"),
+    (b"username=alice", "user:alice"),
+    (b"limit=5", None),
+    (b"", None),
+])
+def test_key_from_query(query_string, expected):
+    assert key_from_query(query_string) == expected
+
+
+@pytest.mark.parametrize("body, expected", [
+    ({"name": "t", "organization_id": "org-1", "creator_username": "alice"},
+     "user:alice"),
+    ({"name": "b", "authorId": "author-1", "authorType": "User"}, "author:author-1"),
+    ({"organization_id": "org-1"}, "org:org-1"),
+    ({"name": "b"}, None),
+    ([1, 2], None),
+])
+def test_key_from_body(body, expected):
+    assert key_from_body(json.dumps(body).encode()) == expected
+
+
+def test_key_from_body_ignores_invalid_json():
+    assert key_from_body(b"{not json") is None
+
+
+def make_scope(headers=(), client=("10.0.0.1", 5000)):
+    return {
+        "headers": [(name.encode(), value.encode()) for name, value in headers],
+        "client": client,
+    }
+
+
+@pytest.mark.parametrize("headers, trusted_proxies, expected", [
+    ((), 1, "10.0.0.1"),
+    ((("x-forwarded-for", "203.0.113.7"),), 1, "203.0.113.7"),
+    # Клиент может подставить свои записи в начало заголовка
+    ((("x-forwarded-for", "1.1.1.1, 203.0.113.7"),), 1, "203.0.113.7"),
+    ((("x-forwarded-for", "1.1.1.1, 203.0.113.7, 10.1.1.1"),), 2, "203.0.113.7"),
+    ((("x-forwarded-for", "203.0.113.7"),), 3, "203.0.113.7"),
+    ((("x-forwarded-for", "203.0.113.7"),), 0, "10.0.0.1"),
+])
+def test_client_ip(headers, trusted_proxies, expected):
+    assert client_ip(make_scope(headers), trusted_proxies) == expected
+
+
+def test_peek_body_replays_messages():
+    messages = [
+        {"type": "http.request", "body": b'{"a":', "more_body": True},
+        {"type": "http.request", "body": b" 1}", "more_body": False},
+    ]
+
+    async def run():
+        pending = list(messages)
+
+        async def receive():
+            return pending.pop(0)
+
+        body, replay = await peek_body(receive, limit=1024)
+        return body, [await replay(), await replay()]
+
+    body, replayed = asyncio.run(run())
+    assert body == b'{"a": 1}'
+    assert replayed == messages
+
+
+def test_peek_body_over_limit_returns_none():
+    async def run():
+        async def receive():
+            return {"type": "http.request", "body": b"x" * 10, "more_body": True}
+
+        return await peek_body(receive, limit=15)
+
+    body, _ = asyncio.run(run())
+    assert body is None
+
+
+# Middleware целиком
+
+def make_client(**limits):
+    async def echo(request):
+        return JSONResponse(await request.json() if request.method == "POST" else {})
+
+    app = Starlette(routes=[
+        Route("/api/bids/new", echo, methods=["POST"]),
+        Route("/api/tenders/", echo),
+        Route("/api/ping", echo),
+    ])
+    settings = dict(rate=0.001, capacity=2, ip_rate=0.001, ip_capacity=4)
+    settings.update(limits)
+    app.add_middleware(RateLimitMiddleware, store=InMemoryTokenBucketStore(),
+                       **settings)
+    return TestClient(app)
+
+
+def test_middleware_keys_body_routes_by_author():
+    client = make_client(ip_capacity=10)
+    # Авторы за одним адресом не делят корзину, а тело доходит до обработчика
+    for index in range(5):
+        response = client.post("/api/bids/new", json={"authorId": f"author-{index}"})
+        assert response.status_code == 200
+        assert response.json() == {"authorId": f"author-{index}"}
+
+    statuses = [client.post("/api/bids/new", json={"authorId": "author-0"}).status_code
+                for _ in range(2)]
+    assert statuses == [200, 429]
+
+
+def test_middleware_charges_ip_bucket_for_keyed_requests():
+    client = make_client()
+    # Смена имени пользователя не обходит лимит адреса
+    statuses = [client.get("/api/tenders/", params={"username": f"user-{index}"})
+                .status_code for index in range(5)]
+    assert statuses == [200, 200, 200, 200, 429]
+
+
+def test_middleware_ip_fallback_uses_forwarded_address_and_ip_limit():
+    client = make_client()
+
+    def get(address):
+        return client.get("/api/tenders/", headers={"X-Forwarded-For": address})
+
+    statuses = [get("203.0.113.7").status_code for _ in range(5)]
+    assert statuses == [200, 200, 200, 200, 429]
+    assert "Retry-After" in get("203.0.113.7").headers
+    # Другой клиент за тем же балансировщиком
+    assert get("203.0.113.8").status_code == 200
+
+
+def test_middleware_exempt_paths():
+    client = make_client(ip_capacity=1)
+    assert [client.get("/api/ping").status_code for _ in range(3)] == [200, 200, 200]
@@ -0,0 +1,131 @@
+import uuid
+from collections import OrderedDict
+from types import SimpleNamespace
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app import crud, tender_diff
+from app.database import get_read_db
+from app.models import TenderStatus
+from app.routers import tenders
+
+
+def make_snapshot(**fields):
+    values = dict(name="Ремонт", description="строка 1\nстрока 2",
+                  service_type="Construction", status=TenderStatus.Published,
+                  organization_id="org-1", creator_username="alice")
+    values.update(fields)
+    return tender_diff.snapshot(SimpleNamespace(**values))
+
+
+@pytest.fixture(autouse=True)
+def empty_cache(monkeypatch):
+    monkeypatch.setattr(tender_diff, "_cache", OrderedDict())
+
+
+def test_compute_diff_reports_only_changed_fields():
+    old = make_snapshot()
+    new = make_snapshot(status=TenderStatus.Closed, creator_username=None)
+    diff = tender_diff.compute_diff(uuid.uuid4(), 1, old, 2, new)
+
+    assert [(change.field, change.old, change.new, change.text_diff)
+            for change in diff.changes] == [
+        ("status", "Published", "Closed", None),
+        ("creator_username", "alice", None, None),
+    ]
+
+
+def test_compute_diff_text_fields_have_line_diff():
+    old = make_snapshot()
+    new = make_snapshot(description="строка 1\nстрока 3")
+    diff = tender_diff.compute_diff(uuid.uuid4(), 1, old, 3, new)
+
+    [change] = diff.changes
+    assert change.field == "description"
+    assert change.text_diff == ["--- v1", "+++ v3", "@@ -1,2 +1,2 @@",
+                                " строка 1", "-строка 2", "+строка 3"]
+
+
+def test_cache_evicts_least_recently_used(monkeypatch):
+    monkeypatch.setattr(tender_diff, "CACHE_SIZE", 2)
+    tender_diff.put_cached(("t", 1, 2), "a")
+    tender_diff.put_cached(("t", 2, 3), "b")
+    assert tender_diff.get_cached(("t", 1, 2)) == "a"
+
+    tender_diff.put_cached(("t", 3, 4), "c")
+    assert tender_diff.get_cached(("t", 2, 3)) is None
+    assert tender_diff.get_cached(("t", 1, 2)) == "a"
+    assert tender_diff.get_cached(("t", 3, 4)) == "c"
+
+
+class FakeSession:
+    async def execute(self, statement):
+        return SimpleNamespace(scalar_one_or_none=lambda: "alice")
+
+    async def close(self):
+        pass
+
+
+@pytest.fixture
+def client(monkeypatch):
+    def version_entity(version, **fields):
+        return SimpleNamespace(version=version, name=f"v{version}", description=None,
+                               service_type="Construction",
+                               status=TenderStatus.Published, organization_id="org-1",
+                               creator_username="alice", **fields)
+
+    tender_id = uuid.uuid4()
+    tender = version_entity(3, id=tender_id)
+    history = {version: version_entity(version) for version in (1, 2)}
+    loads = []
+
+    async def get_tender_by_id(db, tender_id):
+        loads.append(tender_id)
+        return tender
+
+    async def get_tender_history_versions(db, tender_id, versions):
+        return [history[version] for version in versions if version in history]
+
+    monkeypatch.setattr(crud, "get_tender_by_id", get_tender_by_id)
+    monkeypatch.setattr(crud, "get_tender_history_versions",
+                        get_tender_history_versions)
+
+    app = FastAPI()
+    app.include_router(tenders.router, prefix="/api/tenders")
+    app.dependency_overrides[get_read_db] = FakeSession
+    client = TestClient(app)
+    client.tender_id = str(tender_id)
+    client.loads = loads
+    return client
+
+
+def get_diff(client, from_version, to_version):
+    response = client.get(f"/api/tenders/{client.tender_id}/diff",
+                          params={"from": from_version, "to": to_version,
+                                  "username": "alice"})
+    assert response.status_code == 200
+    return response.json()
+
+
+def test_diff_between_history_versions_is_cached(client):
+    first = get_diff(client, 1, 2)
+    assert first["changes"][0]["old"] == "v1"
+    assert first["changes"][0]["new"] == "v2"
+    assert get_diff(client, 1, 2) == first
+    assert len(client.loads) == 1
+    assert (client.tender_id, 1, 2) in tender_diff._cache
+
+
+def test_diff_with_live_version_is_not_cached(client):
+    assert get_diff(client, 2, 3)["changes"][0]["new"] == "v3"
+    get_diff(client, 2, 3)
+    assert len(client.loads) == 2
+    assert len(tender_diff._cache) == 0
+
+
+def test_diff_unknown_version_returns_404(client):
+    response = client.get(f"/api/tenders/{client.tender_id}/diff",
+                          params={"from": 1, "to": 7, "username": "alice"})
+    assert response.status_code == 404